@@ -0,0 +1,117 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import instrumentation
+import retention
+from extract import OUTPUT_FORMAT, PROFILE_NAME, extract_report
+from report_io import write_table
+from session_analytics import derived_tables
+
+REPORT_EXTENSIONS = (".html", ".htm", ".xml")
+
+def find_reports(source):
+    """Lists the battery reports in a directory (recursively) or matching a glob pattern."""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "**", "*"), recursive=True)
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path) and path.lower().endswith(REPORT_EXTENSIONS))
+
+def extract_tagged(path):
+    """Extracts one report and tags its rows, returning (path, tables, error, stages).
+
+    Runs inside the worker processes, so a broken report only yields an error.
+    stages holds the instrumentation records of this report when profiling is on.
+    """
+    try:
+        with instrumentation.stage("extract_report", path=path):
+            report = extract_report(path)
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}", instrumentation.drain()
+
+    tables = {
+        "system_info": pd.DataFrame([report.system_info]),
+        "battery_details": pd.DataFrame([report.battery_details]),
+        **report.tables,
+        **derived_tables(report),
+    }
+    # Tag every row so the fleet tables can be split per device again
+    for df in tables.values():
+        df.insert(0, "COMPUTER NAME", report.system_info["Computer Name"])
+        df.insert(1, "REPORT", path)
+    return path, tables, None, instrumentation.drain()
+
+def extract_batch(paths, workers=None):
+    """Extracts reports across a process pool and concatenates each table over all of them.
+
+    Returns the consolidated tables, a list of (path, error) for reports that failed
+    and the instrumentation records of every report.
+    """
+    results = []
+    if workers == 1:
+        results = [extract_tagged(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Small chunks keep workers busy while limiting per-task overhead
+            chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 8))
+            for done, result in enumerate(executor.map(extract_tagged, paths, chunksize=chunksize), 1):
+                results.append(result)
+                if done % 100 == 0 or done == len(paths):
+                    print(f"Extracted {done}/{len(paths)} reports")
+
+    frames, failures, stages = {}, [], []
+    for path, tables, error, report_stages in results:
+        stages.extend(report_stages)
+        if error:
+            failures.append((path, error))
+            continue
+        for name, df in tables.items():
+            frames.setdefault(name, []).append(df)
+
+    consolidated = {name: pd.concat(dfs, ignore_index=True) for name, dfs in frames.items()}
+    return consolidated, failures, stages
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract many existing battery reports into one set of tables.")
+    parser.add_argument("source", help="directory of reports or a glob pattern such as 'reports/**/*.html'")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fleet-report"),
+                        help=f"directory for the consolidated tables ({retention.OUTPUT_HELP_NOTE})")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-f", "--format", choices=["csv", "arrow"], default=OUTPUT_FORMAT, help="output format")
+    parser.add_argument("--profile", action="store_true", help=f"record stage timings of every report to {PROFILE_NAME}")
+    args = parser.parse_args()
+    started = time.time()
+    if args.profile:
+        instrumentation.enable()
+
+    paths = find_reports(args.source)
+    if not paths:
+        print(f"No battery reports found in {args.source}")
+        return
+
+    tables, failures, stages = extract_batch(paths, args.workers)
+    os.makedirs(args.output, exist_ok=True)
+    for name, df in tables.items():
+        with instrumentation.stage("write_table", table=name, format=args.format) as stage:
+            write_table(df, name, args.output, args.format)
+            stage.rows = len(df)
+    instrumentation.write(os.path.join(args.output, PROFILE_NAME), stages=stages + instrumentation.drain())
+
+    failed_path = os.path.join(args.output, "failed_reports.csv")
+    if failures:
+        pd.DataFrame(failures, columns=["REPORT", "ERROR"]).to_csv(failed_path, index=False)
+        print(f"{len(failures)} report(s) failed, see {failed_path}")
+    elif os.path.exists(failed_path):
+        os.remove(failed_path)
+
+    print(f"Batch Extraction Complete! {len(paths) - len(failures)} of {len(paths)} reports saved to {args.output}")
+
+    retention.enforce_after_run(started)
+
+if __name__ == "__main__":
+    main()
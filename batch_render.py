@@ -0,0 +1,152 @@
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import instrumentation
+import retention
+from charts import CHARTS, PROFILE_NAME, load_plot
+from report_io import OUTPUT_FORMATS, read_table
+
+# Figure size in inches and the DPI limits, so no chart renders to a huge bitmap
+FIGURE_SIZE = (12, 6)
+MAX_FIGURE_SIZE = (20, 12)
+MAX_DPI = 300
+
+IMAGE_FORMATS = ("png", "svg")
+
+# One figure per chart in each worker process, cleared and reused for every report
+_figures = {}
+
+def find_table_dirs(source):
+    """Lists the directories holding extracted tables in a directory (recursively) or matching a glob pattern."""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "**", "recent_usage.*"), recursive=True)
+    else:
+        paths = [path for candidate in glob.glob(source, recursive=True)
+                 for path in glob.glob(os.path.join(candidate, "recent_usage.*"))]
+    extensions = tuple(OUTPUT_FORMATS.values())
+    return sorted({os.path.dirname(path) for path in paths if path.endswith(extensions)})
+
+def _report_label(path):
+    """Turns a report path of a fleet table into a directory name."""
+    return re.sub(r"[^\w.-]+", "_", os.path.splitext(os.path.splitdrive(path)[1])[0]).strip("_")
+
+def load_jobs(table_dir):
+    """Returns (label, tables) for each report in a table directory.
+
+    A batch_extract output holds many reports tagged by a REPORT column and is
+    split per report, a battery-report directory is one report.
+    """
+    tables = {}
+    for name in CHARTS:
+        with instrumentation.stage("load", table=name, source=table_dir) as stage:
+            tables[name] = read_table(name, table_dir)
+            stage.rows = len(tables[name])
+    if "REPORT" not in tables["recent_usage"].columns:
+        return [(os.path.basename(os.path.abspath(table_dir)), tables)]
+
+    groups = {name: dict(list(df.groupby("REPORT", sort=False))) for name, df in tables.items()}
+    reports = sorted(set().union(*groups.values()))
+    empty = {name: df.iloc[:0] for name, df in tables.items()}
+    return [
+        (_report_label(report), {name: groups[name].get(report, empty[name]) for name in CHARTS})
+        for report in reports
+    ]
+
+def _figure(table_name, size, dpi):
+    figure = _figures.get(table_name)
+    if figure is None:
+        figure = _figures[table_name] = Figure(figsize=size, dpi=dpi, layout="constrained")
+        FigureCanvasAgg(figure)
+    else:
+        figure.clear()
+    return figure
+
+def render_report(label, tables, output_dir, formats=("png",), size=FIGURE_SIZE, dpi=100):
+    """Renders every chart of one report to output_dir/label, returning (label, paths, error)."""
+    report_dir = os.path.join(output_dir, label)
+    try:
+        os.makedirs(report_dir, exist_ok=True)
+        paths = []
+        for table_name in CHARTS:
+            with instrumentation.stage("render", chart=table_name, report=label) as stage:
+                figure = _figure(table_name, size, dpi)
+                load_plot(table_name)(tables[table_name], figure.add_subplot())
+                for image_format in formats:
+                    path = os.path.join(report_dir, f"{table_name}.{image_format}")
+                    figure.savefig(path, format=image_format)
+                    paths.append(path)
+                stage.rows = len(tables[table_name])
+    except Exception as e:
+        return label, [], f"{type(e).__name__}: {e}"
+    finally:
+        instrumentation.write(os.path.join(report_dir, PROFILE_NAME))
+    return label, paths, None
+
+def _render_job(job):
+    return render_report(*job)
+
+def render_batch(table_dirs, output_dir, formats=("png",), size=FIGURE_SIZE, dpi=100, workers=None):
+    """Renders the charts of every report found in table_dirs across a process pool.
+
+    Returns the number of reports rendered and a list of (label, error) for the ones that failed.
+    """
+    size = tuple(min(value, limit) for value, limit in zip(size, MAX_FIGURE_SIZE))
+    dpi = min(dpi, MAX_DPI)
+    jobs = [(label, tables, output_dir, formats, size, dpi)
+            for table_dir in table_dirs for label, tables in load_jobs(table_dir)]
+    instrumentation.write(os.path.join(output_dir, PROFILE_NAME))
+
+    if workers == 1:
+        results = [_render_job(job) for job in jobs]
+    else:
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for done, result in enumerate(executor.map(_render_job, jobs), 1):
+                results.append(result)
+                if done % 100 == 0 or done == len(jobs):
+                    print(f"Rendered {done}/{len(jobs)} reports")
+
+    failures = [(label, error) for label, _, error in results if error]
+    return len(results) - len(failures), failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the charts of extracted battery reports to image files, without a display.")
+    parser.add_argument("source", nargs="+",
+                        help="directories of extracted tables (battery-report/, fleet-report/) or glob patterns")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "charts"),
+                        help=f"directory for the images, one subdirectory per report ({retention.OUTPUT_HELP_NOTE})")
+    parser.add_argument("-f", "--format", choices=IMAGE_FORMATS, action="append",
+                        help="image format, repeat for several (default: png)")
+    parser.add_argument("--dpi", type=int, default=100, help=f"resolution of bitmap images (at most {MAX_DPI})")
+    parser.add_argument("--size", type=float, nargs=2, default=FIGURE_SIZE, metavar=("WIDTH", "HEIGHT"),
+                        help=f"figure size in inches (at most {MAX_FIGURE_SIZE[0]}x{MAX_FIGURE_SIZE[1]})")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"record stage timings to {PROFILE_NAME} in the output and each report directory")
+    args = parser.parse_args()
+    started = time.time()
+    if args.profile:
+        instrumentation.enable()
+
+    table_dirs = sorted({table_dir for source in args.source for table_dir in find_table_dirs(source)})
+    if not table_dirs:
+        print(f"No extracted tables found in {', '.join(args.source)}")
+        return
+
+    rendered, failures = render_batch(table_dirs, args.output, tuple(args.format or ["png"]),
+                                      tuple(args.size), args.dpi, args.workers)
+    for label, error in failures:
+        print(f"Failed to render {label}: {error}")
+    print(f"Batch Rendering Complete! Charts of {rendered} report(s) saved to {args.output}")
+
+    retention.enforce_after_run(started)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,34 @@
 import os
+import instrumentation
+from charts import PROFILE_NAME
 import pandas as pd
-import matplotlib.pyplot as plt
+from report_io import read_table
+from level_of_detail import LevelOfDetailLine
 
-# Get the directory path
-dir_path = os.path.dirname(os.path.abspath(__file__))
+def plot_battery_capacity_history(battery_capacity_history, ax):
+    """Draws the full charge capacity of each period on ax."""
+    LevelOfDetailLine(ax, pd.to_datetime(battery_capacity_history['PERIOD_START']), battery_capacity_history['FULL CHARGE CAPACITY'])
+    ax.set_xlabel('Period')
+    ax.set_ylabel('Full Charge Capacity')
+    ax.set_title('Battery Capacity History')
+    ax.tick_params(axis='x', labelrotation=45)
 
-# Load dataset
-battery_capacity_history = pd.read_csv(os.path.join(dir_path, 'battery-report', 'battery_capacity_history.csv'))
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
 
-# Visualization
-plt.figure(figsize=(20, 6))
-plt.plot(battery_capacity_history['PERIOD'], battery_capacity_history['FULL CHARGE CAPACITY'])
-plt.xlabel('Period')
-plt.ylabel('Full Charge Capacity')
-plt.title('Battery Capacity History')
-plt.xticks(rotation=45)
-plt.show()
\ No newline at end of file
+    # Get the directory path
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+    report_dir = os.path.join(dir_path, 'battery-report')
+
+    # Load dataset
+    with instrumentation.stage('load', table='battery_capacity_history') as stage:
+        battery_capacity_history = read_table('battery_capacity_history', report_dir)
+        stage.rows = len(battery_capacity_history)
+
+    # Visualization
+    fig, ax = plt.subplots(figsize=(20, 6))
+    with instrumentation.stage('render', chart='battery_capacity_history'):
+        plot_battery_capacity_history(battery_capacity_history, ax)
+        fig.canvas.draw()
+    instrumentation.write(os.path.join(report_dir, PROFILE_NAME), append=True)
+    plt.show()
@@ -1,19 +1,34 @@
 import os
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import instrumentation
+from charts import PROFILE_NAME
+from report_io import read_table
 
-# Get the directory path
-dir_path = os.path.dirname(os.path.abspath(__file__))
+def plot_battery_life_estimates(battery_life_estimates, ax):
+    """Draws the life estimate at full charge of each period as bars on ax."""
+    # Durations are stored in seconds, plot them in hours. One bar per period, so no error bars
+    hours = battery_life_estimates['AT FULL CHARGE ACTIVE'].to_numpy(dtype=float, na_value=float('nan')) / 3600
+    ax.bar(battery_life_estimates['PERIOD'].astype(str), hours)
+    ax.set_xlabel('Period')
+    ax.set_ylabel('Life Estimate at Full Charge (hours)')
+    ax.set_title('Battery Life Estimates')
+    ax.tick_params(axis='x', labelrotation=45)
 
-# Load dataset
-battery_life_estimates = pd.read_csv(os.path.join(dir_path, 'battery-report', 'battery_life_estimates.csv'))
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
 
-# Visualization
-plt.figure(figsize=(40, 25))
-sns.barplot(x='PERIOD', y='AT FULL CHARGE ACTIVE', data=battery_life_estimates)
-plt.xlabel('Period')
-plt.ylabel('Life Estimate at Full Charge')
-plt.title('Battery Life Estimates')
-plt.xticks(rotation=45)
-plt.show()
\ No newline at end of file
+    # Get the directory path
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+    report_dir = os.path.join(dir_path, 'battery-report')
+
+    # Load dataset
+    with instrumentation.stage('load', table='battery_life_estimates') as stage:
+        battery_life_estimates = read_table('battery_life_estimates', report_dir)
+        stage.rows = len(battery_life_estimates)
+
+    # Visualization
+    fig, ax = plt.subplots(figsize=(14, 7))
+    with instrumentation.stage('render', chart='battery_life_estimates'):
+        plot_battery_life_estimates(battery_life_estimates, ax)
+        fig.canvas.draw()
+    instrumentation.write(os.path.join(report_dir, PROFILE_NAME), append=True)
+    plt.show()
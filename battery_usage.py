@@ -1,23 +1,37 @@
 import os
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import instrumentation
+from charts import PROFILE_NAME
+from report_io import read_table, start_times
+from level_of_detail import LevelOfDetailLine
 
-# Get the directory path
-dir_path = os.path.dirname(os.path.abspath(__file__))
+def plot_battery_usage(battery_usage, ax):
+    """Draws the energy drained over time on ax, keeping the drain spikes of the visible range."""
+    LevelOfDetailLine(ax, start_times(battery_usage), battery_usage['ENERGY DRAINED'], method='minmax')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Energy Drained')
+    ax.set_title('Battery Usage')
+    ax.tick_params(axis='x', labelrotation=45)
 
-# Load dataset
-battery_usage = pd.read_csv(os.path.join(dir_path, 'battery-report', 'battery_usage.csv'))
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
 
-# Display the first few rows
-print("Battery Usage:")
-print(battery_usage.head())
+    # Get the directory path
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+    report_dir = os.path.join(dir_path, 'battery-report')
 
-# Visualization
-plt.figure(figsize=(10, 6))
-sns.lineplot(x='DATE', y='ENERGY DRAINED', data=battery_usage)
-plt.xlabel('Date')
-plt.ylabel('Energy Drained')
-plt.title('Battery Usage')
-plt.xticks(rotation=45)
-plt.show()
\ No newline at end of file
+    # Load dataset
+    with instrumentation.stage('load', table='battery_usage') as stage:
+        battery_usage = read_table('battery_usage', report_dir)
+        stage.rows = len(battery_usage)
+
+    # Display the first few rows
+    print("Battery Usage:")
+    print(battery_usage.head())
+
+    # Visualization
+    fig, ax = plt.subplots(figsize=(10, 6))
+    with instrumentation.stage('render', chart='battery_usage'):
+        plot_battery_usage(battery_usage, ax)
+        fig.canvas.draw()
+    instrumentation.write(os.path.join(report_dir, PROFILE_NAME), append=True)
+    plt.show()
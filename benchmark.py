@@ -0,0 +1,98 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+import extract
+from report_io import write_table
+from synthetic_report import write_report
+
+# recent_usage rows of the synthetic reports, 1M is available through --scales
+DEFAULT_SCALES = [100, 1_000, 10_000, 100_000]
+
+def _time(function, repeat, setup=None):
+    """Runs function repeat times and returns (seconds of each run, last result); setup is not timed."""
+    timings, result = [], None
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        result = function(argument) if setup else function()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+def benchmark_report(path, repeat, output_dir, output_format="csv"):
+    """Times the hot paths of the extraction on one report, returning rows of results."""
+    results = []
+
+    # rows is the size of the table a stage works on, None for whole-document stages
+    def record(stage, rows, timings):
+        results.append({"stage": stage, "rows": rows, "best_s": min(timings), "median_s": statistics.median(timings)})
+
+    if path.endswith(".xml"):
+        timings, raw = _time(lambda: extract.read_xml_report(path), repeat)
+        record("read_xml_report", len(raw.recent_usage), timings)
+    else:
+        with open(path, "rb") as file:
+            data = file.read()
+        timings, index = _time(lambda: extract.build_report_index(data), repeat)
+        record(f"build_report_index ({index.backend})", None, timings)
+        for name, (header, _, _) in extract.HTML_TABLES.items():
+            timings, df = _time(lambda: extract.extract_table(index, header), repeat)
+            record(f"extract_table {name}", len(df), timings)
+        raw = extract.read_html_report(path)
+
+    for name, clean in extract.TABLE_CLEANERS.items():
+        table = getattr(raw, name)
+        timings, _ = _time(clean, repeat, setup=table.copy)
+        record(f"clean {name}", len(table), timings)
+
+    timings, _ = _time(extract.clean_and_fix_period, repeat, setup=raw.usage_history.copy)
+    record("clean_and_fix_period", len(raw.usage_history), timings)
+
+    report = extract.clean_report(raw)
+    for name, df in report.tables.items():
+        timings, _ = _time(lambda: write_table(df, name, output_dir, output_format), repeat)
+        record(f"write_table {name} ({output_format})", len(df), timings)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the extraction hot paths on synthetic battery reports.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="recent usage rows of each report")
+    parser.add_argument("--formats", nargs="+", choices=["html", "xml"], default=["html"], help="report formats to time")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per stage, the best and median are kept")
+    parser.add_argument("--output-format", choices=["csv", "arrow"], default="csv", help="format timed by write_table")
+    parser.add_argument("--reports", default=None, help="directory to keep generated reports in between runs")
+    parser.add_argument("-o", "--output", default=None, help="CSV file to save the results to")
+    parser.add_argument("--compare", default=None, help="CSV of earlier results to compare the best times against")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        report_dir = args.reports or work_dir
+        os.makedirs(report_dir, exist_ok=True)
+        for scale in args.scales:
+            for report_format in args.formats:
+                path = os.path.join(report_dir, f"synthetic-{scale}.{report_format}")
+                if not os.path.exists(path):
+                    write_report(path, scale)
+                print(f"Timing {report_format} report with {scale} rows...")
+                for result in benchmark_report(path, args.repeat, work_dir, args.output_format):
+                    rows.append({"scale": scale, "format": report_format, **result})
+
+    results = pd.DataFrame(rows)
+    if args.compare:
+        baseline = pd.read_csv(args.compare)[["scale", "format", "stage", "best_s"]]
+        results = results.merge(baseline.rename(columns={"best_s": "baseline_s"}), on=["scale", "format", "stage"], how="left")
+        results["change_%"] = (results["best_s"] / results["baseline_s"] - 1) * 100
+
+    with pd.option_context("display.max_rows", None, "display.width", 200, "display.float_format", "{:.4f}".format):
+        print(results.to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from importlib import import_module
+
+# The five report charts, in sidebar order: report table -> (title, chart module, plot function).
+# The chart modules import pandas and matplotlib, so they are only loaded by load_plot.
+CHARTS = {
+    "battery_capacity_history": ("Battery Capacity History", "battery_cap_hist", "plot_battery_capacity_history"),
+    "battery_life_estimates": ("Battery Life Estimates", "battery_life_estimate", "plot_battery_life_estimates"),
+    "battery_usage": ("Battery Usage", "battery_usage", "plot_battery_usage"),
+    "recent_usage": ("Recent Usage", "recent_usage", "plot_recent_usage"),
+    "usage_history": ("Usage History", "usage_history", "plot_usage_history"),
+}
+
+# Stage timings of chart loads and renders, appended next to the tables when BATTERY_PROFILE=1
+PROFILE_NAME = "profile-charts.json"
+
+def load_plot(table_name):
+    """Imports the chart module of a table and returns its plot function."""
+    _, module_name, function_name = CHARTS[table_name]
+    return getattr(import_module(module_name), function_name)
@@ -1,266 +1,873 @@
 import os
+import shutil
 import subprocess
+import time
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from report_io import normalize_table, read_table, time_of_day, write_table
+import history_store
+import instrumentation
+import report_cache
+import rollups
+import session_analytics
+import wear_model
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional, html.parser is always available
+    lxml = None
 
 dir_path = os.path.dirname(os.path.abspath(__file__))
-file_path = dir_path.capitalize() + r"\battery-report\battery-report.html"
+report_dir = os.path.join(dir_path, "battery-report")
+file_path = os.path.join(report_dir, "battery-report.html")
+xml_file_path = os.path.join(report_dir, "battery-report.xml")
 
-command = f'powercfg /batteryreport /output "{file_path}"'
-subprocess.run(command, shell=True)
+# Set BATTERY_REPORT_FORMAT=arrow to write memory-mappable Arrow files instead of CSV
+OUTPUT_FORMAT = os.environ.get("BATTERY_REPORT_FORMAT", "csv")
 
-with open(file_path, "r", encoding="utf-8") as file:
-    soup = BeautifulSoup(file, "html.parser")
+# Long-term history, kept outside battery-report/ so it survives gone.py
+HISTORY_PATH = os.environ.get("BATTERY_HISTORY_PATH", os.path.join(dir_path, "battery-history.sqlite"))
 
-def fill_missing_dates(times):
-    last_date = None
-    new_times = []
+# Set BATTERY_REPORT_SOURCE to an existing report to use it instead of running powercfg,
+# which lets the generation and extraction flow run on machines without powercfg
+REPORT_SOURCE = os.environ.get("BATTERY_REPORT_SOURCE")
 
-    for time in times:
-        if " " in time:  # Full timestamp present
-            last_date = time.split(" ")[0]  # Extract date part
-            new_times.append(time)
-        else:  # Only time is present, prepend last known date
-            new_times.append(f"{last_date} {time}" if last_date else time)
+# Seconds powercfg may take to write a report before it is killed
+GENERATE_TIMEOUT = float(os.environ.get("BATTERY_REPORT_TIMEOUT", "120"))
 
-    return new_times
+# Set BATTERY_REPORT_CACHE=0 to reprocess every section even when its content did not change
+REPORT_CACHE = os.environ.get("BATTERY_REPORT_CACHE", "1") not in ("", "0")
 
-def extract_time_percentage(column):
-    time_values = []
-    percent_values = []
-    
-    for value in column.astype(str):
-        match = re.search(r"(\d{1,2}:\d{2}:\d{2})\s*(\d+)%?", value)
-        if match:
-            time_values.append(match.group(1))  # Extract time
-            percent_values.append(match.group(2))  # Extract percentage
-        else:  # If no match, default to empty values
-            time_values.append("")
-            percent_values.append("")
-    
-    return time_values, percent_values
-
-def find_table_value(label):
-    """Finds the value next to a label in a table, handling missing elements safely."""
-    cell = soup.find("td", string=lambda text: text and label.lower() in text.lower())
-    return cell.find_next_sibling("td").text.strip() if cell else "N/A"
-
-system_info = {
-    "Computer Name": find_table_value("COMPUTER NAME"),
-    "System Product Name": find_table_value("SYSTEM PRODUCT NAME"),
-    "OS Build": find_table_value("OS BUILD"),
-    "BIOS": find_table_value("BIOS"),
-    "Report Time": find_table_value("REPORT TIME")
-}
+# Stage timings of the last run, written next to the tables when BATTERY_PROFILE=1
+PROFILE_NAME = "profile.json"
 
-battery_details = {
-    "Battery Name": find_table_value("NAME"),
-    "Manufacturer": find_table_value("MANUFACTURER"),
-    "Chemistry": find_table_value("CHEMISTRY"),
-    "Design Capacity": find_table_value("DESIGN CAPACITY"),
-    "Full Charge Capacity": find_table_value("FULL CHARGE CAPACITY"),
-}
-
-def extract_table(section_header):
-    """Extracts table data under a given section header."""
-    section = soup.find("h2", string=lambda text: text and section_header.lower() in text.lower())
-    if not section:
-        return pd.DataFrame()  
-    
-    table = section.find_next("table")
-    if not table:
-        return pd.DataFrame()
+# The five tables of a battery report, in report order
+TABLE_NAMES = [
+    "recent_usage",
+    "battery_usage",
+    "usage_history",
+    "battery_capacity_history",
+    "battery_life_estimates",
+]
 
+@dataclass
+class ReportTables:
+    """Everything extracted from one battery report, held in memory."""
+
+    system_info: dict
+    battery_details: dict
+    recent_usage: pd.DataFrame
+    battery_usage: pd.DataFrame
+    usage_history: pd.DataFrame
+    battery_capacity_history: pd.DataFrame
+    battery_life_estimates: pd.DataFrame
+    # Tables derived from the ones above, filled and cached by session_analytics.derived_tables
+    derived: dict = field(default_factory=dict)
+
+    @property
+    def tables(self):
+        """The five report tables by name."""
+        return {name: getattr(self, name) for name in TABLE_NAMES}
+
+class ReportIndex:
+    """Index of a battery report built in a single walk over the document.
+
+    Each h2 section is mapped to the first table that follows it and every
+    label cell is kept in document order, so lookups never rescan the tree.
+    """
+
+    def __init__(self, backend, sections, labels, read_table, read_value):
+        self.backend = backend
+        self.sections = sections  # [(h2 text lowered, table element)]
+        self.labels = labels  # [(td text lowered, td element)]
+        self._read_table = read_table
+        self._read_value = read_value
+        self._values = {}
+
+    def find_value(self, label):
+        """Returns the text of the cell next to the first cell containing label."""
+        key = label.lower()
+        if key not in self._values:
+            self._values[key] = "N/A"
+            for text, cell in self.labels:
+                if key in text:
+                    self._values[key] = self._read_value(cell)
+                    break
+        return self._values[key]
+
+    def find_table(self, section_header):
+        """Returns (headers, rows) of the table under a section header, or None."""
+        key = section_header.lower()
+        for text, table in self.sections:
+            if key in text:
+                return self._read_table(table) if table is not None else None
+        return None
+
+def _bs4_table(table):
     rows = []
     for row in table.find_all("tr", class_=["even", "odd"]):
         cols = [td.get_text(strip=True) for td in row.find_all("td")]
-        if cols:  
+        if cols:
             rows.append(cols)
 
     first_row = table.find("tr")
-    headers = [th.get_text(strip=True) for th in first_row.find_all("th")]
-
-    max_columns = max(len(row) for row in rows) if rows else 0
-    if not headers or len(headers) != max_columns:
-        headers = [f"Column_{i+1}" for i in range(max_columns)]
+    headers = [th.get_text(strip=True) for th in first_row.find_all("th")] if first_row else []
+    return headers, rows
+
+def _bs4_value(cell):
+    value_cell = cell.find_next_sibling("td")
+    return value_cell.text.strip() if value_cell else "N/A"
+
+def index_with_html_parser(data):
+    """Builds a ReportIndex with BeautifulSoup and the stdlib html.parser."""
+    soup = BeautifulSoup(data.decode("utf-8"), "html.parser")
+    sections, labels, pending = [], [], []
+
+    for element in soup.find_all(["h2", "table", "td"]):
+        if element.name == "td":
+            text = element.string
+            if text:
+                labels.append((text.lower(), element))
+        elif element.name == "h2":
+            text = element.string
+            if text:
+                pending.append(text.lower())
+        else:
+            sections.extend((text, element) for text in pending)
+            pending = []
+
+    sections.extend((text, None) for text in pending)
+    return ReportIndex("html.parser", sections, labels, _bs4_table, _bs4_value)
+
+def _lxml_string(element):
+    """Mirrors BeautifulSoup's .string: the only text inside element, else None."""
+    children = list(element)
+    if not children:
+        return element.text
+    if len(children) == 1 and not element.text and not children[0].tail:
+        return _lxml_string(children[0])
+    return None
+
+def _lxml_text(element):
+    return "".join(text.strip() for text in element.itertext())
+
+def _lxml_table(table):
+    rows = []
+    first_row = None
+    for row in table.iter("tr"):
+        if first_row is None:
+            first_row = row
+        if not {"even", "odd"} & set(row.get("class", "").split()):
+            continue
+        cols = [_lxml_text(td) for td in row.iter("td")]
+        if cols:
+            rows.append(cols)
 
-    return pd.DataFrame(rows, columns=headers)
+    headers = [_lxml_text(th) for th in first_row.iter("th")] if first_row is not None else []
+    return headers, rows
+
+def _lxml_value(cell):
+    value_cell = cell.getnext()
+    while value_cell is not None and value_cell.tag != "td":
+        value_cell = value_cell.getnext()
+    return "".join(value_cell.itertext()).strip() if value_cell is not None else "N/A"
+
+def index_with_lxml(data):
+    """Builds a ReportIndex directly on an lxml tree, without BeautifulSoup."""
+    root = lxml.html.document_fromstring(data, parser=lxml.html.HTMLParser(encoding="utf-8"))
+    sections, labels, pending = [], [], []
+
+    for element in root.iter("h2", "table", "td"):
+        if element.tag == "td":
+            text = _lxml_string(element)
+            if text:
+                labels.append((text.lower(), element))
+        elif element.tag == "h2":
+            text = _lxml_string(element)
+            if text:
+                pending.append(text.lower())
+        else:
+            sections.extend((text, element) for text in pending)
+            pending = []
+
+    sections.extend((text, None) for text in pending)
+    return ReportIndex("lxml", sections, labels, _lxml_table, _lxml_value)
+
+# Parser backends in order of preference, the first available one is used
+PARSER_BACKENDS = {
+    "lxml": index_with_lxml if lxml else None,
+    "html.parser": index_with_html_parser,
+}
 
-def clean_energy_value(value):
-    """Cleans energy values by removing 'mWh', commas, and converting to numeric."""
-    if isinstance(value, str):
-        # Remove 'mWh', commas, and spaces
-        value = value.replace('mWh', '').replace(',', '').strip()
-        # Remove any surrounding quotes
-        value = value.strip('"')
-        # Try to convert to float, return 0 if not possible
-        try:
-            return float(value)
-        except ValueError:
-            return 0
-    return value
-
-
-recent_usage = extract_table("Recent usage")
-battery_usage = extract_table("Battery usage")
-usage_history = extract_table("Usage history")
-battery_capacity_history = extract_table("Battery capacity history")
-battery_life_estimates = extract_table("Battery life estimates")
-
-pd.DataFrame([system_info]).to_csv(dir_path.capitalize() + r"\battery-report\system_info.csv", index=False)
-pd.DataFrame([battery_details]).to_csv(dir_path.capitalize() + r"\battery-report\battery_details.csv", index=False)
-
-recent_usage.columns = [
-    "START TIME",
-    "STATE",
-    "SOURCE",
-    "CAPACITY REMAINING PERCENT",
-    "CAPACITY REMAINING"
-]
+def build_report_index(data, backend=None):
+    """Parses raw report bytes once with the requested or fastest available backend."""
+    if backend is None:
+        backend = next(name for name, build in PARSER_BACKENDS.items() if build)
+    build = PARSER_BACKENDS.get(backend)
+    if build is None:
+        raise ValueError(f"Parser backend {backend!r} is not available")
+    return build(data)
+
+# Display names used by the HTML report for the XML EntryType values
+XML_ENTRY_STATES = {
+    "Active": "Active",
+    "ConnectedStandby": "Connected standby",
+    "Suspend": "Suspended",
+    "ReportGenerated": "Report generated",
+}
 
-# Fix missing spaces between date and time
-recent_usage["START TIME"] = recent_usage["START TIME"].astype(str).apply(
-    lambda x: re.sub(r'(\d{4}-\d{2}-\d{2})(\d{2}:\d{2}:\d{2})', r'\1 \2', x)
-)
+ISO_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:([\d.]+)S)?)?")
+
+def _xml_tag(element):
+    return element.tag.rsplit("}", 1)[-1]
+
+def _xml_seconds(value):
+    """Converts an ISO 8601 duration such as 'PT1H2M3S' to seconds."""
+    match = ISO_DURATION.fullmatch(value or "")
+    if not match:
+        return 0
+    days, hours, minutes, seconds = match.groups()
+    return int(days or 0) * 86400 + int(hours or 0) * 3600 + int(minutes or 0) * 60 + int(float(seconds or 0))
+
+def _format_hms(seconds):
+    """Formats seconds the way the HTML report does: 'h:mm:ss', or '-' for nothing."""
+    if seconds <= 0:
+        return "-"
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def _format_mwh(value):
+    return f"{int(value):,} mWh"
+
+def _format_timestamp(value):
+    return (value or "")[:19].replace("T", " ")
+
+def _life_estimate(duration, energy, capacity):
+    """Seconds a full battery of the given capacity lasts at the observed drain rate."""
+    return duration * capacity / energy if energy > 0 else 0
+
+def _standby_estimate(duration, energy, capacity):
+    """Connected standby life as 'h:mm:ss N %', N being the share drained per 16 hours."""
+    seconds = _life_estimate(duration, energy, capacity)
+    if seconds <= 0:
+        return "-"
+    return f"{_format_hms(seconds)} {round(16 * 3600 * 100 / seconds)} %"
+
+def read_xml_report(path):
+    """Streams a 'powercfg /batteryreport /xml' report into raw ReportTables.
+
+    The tables get the same columns the HTML path produces after renaming,
+    so both share the cleaning.
+    """
+    # The keys of the HTML path, values missing from the report stay "N/A"
+    system_info = dict.fromkeys(["Computer Name", "System Product Name", "OS Build", "BIOS", "Report Time"], "N/A")
+    battery_details = dict.fromkeys(["Battery Name", "Manufacturer", "Chemistry", "Design Capacity", "Full Charge Capacity"], "N/A")
+    battery_read = False
+    recent_rows, battery_rows, history_rows, capacity_rows, estimate_rows = [], [], [], [], []
+    previous = None  # Last usage entry, a drain ends where the next entry starts
+    stack = []
+
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(element)
+            continue
+        stack.pop()
+        tag = _xml_tag(element)
+
+        if tag == "UsageEntry":
+            timestamp = element.get("LocalTimestamp") or element.get("Timestamp")
+            state = XML_ENTRY_STATES.get(element.get("EntryType"), element.get("EntryType", ""))
+            on_ac = element.get("Ac") == "1"
+            charge = int(element.get("ChargeCapacity") or 0)
+            full_charge = int(element.get("FullChargeCapacity") or 0)
+            recent_rows.append([
+                _format_timestamp(timestamp),
+                state,
+                "AC" if on_ac else "Battery",
+                f"{round(charge * 100 / full_charge)} %" if full_charge else "-",
+                _format_mwh(charge) if charge else "-",
+            ])
+
+            if previous and not previous["on_ac"] and previous["state"] in ("Active", "Connected standby"):
+                start = datetime.fromisoformat(_format_timestamp(previous["timestamp"]))
+                duration = (datetime.fromisoformat(_format_timestamp(timestamp)) - start).total_seconds()
+                drained = max(previous["charge"] - charge, 0)
+                battery_rows.append([
+                    _format_timestamp(previous["timestamp"]),
+                    previous["state"],
+                    _format_hms(duration),
+                    f"{round(drained * 100 / previous['full_charge'])} %" if previous["full_charge"] else "-",
+                    _format_mwh(drained) if drained else "-",
+                ])
+            previous = {"timestamp": timestamp, "state": state, "on_ac": on_ac,
+                        "charge": charge, "full_charge": full_charge}
+
+        elif tag == "HistoryEntry":
+            period = f"{(element.get('LocalStartDate') or element.get('StartDate', ''))[:10]} - " \
+                     f"{(element.get('LocalEndDate') or element.get('EndDate', ''))[:10]}"
+            active_dc = _xml_seconds(element.get("ActiveDcTime"))
+            standby_dc = _xml_seconds(element.get("CsDcTime"))
+            active_energy = int(element.get("ActiveDcEnergy") or 0)
+            standby_energy = int(element.get("CsDcEnergy") or 0)
+            full_charge = int(element.get("FullChargeCapacity") or 0)
+            design = int(element.get("DesignCapacity") or 0)
+            history_rows.append([
+                period,
+                _format_hms(active_dc),
+                _format_hms(standby_dc),
+                _format_hms(_xml_seconds(element.get("ActiveAcTime"))),
+                _format_hms(_xml_seconds(element.get("CsAcTime"))),
+            ])
+            capacity_rows.append([period, _format_mwh(full_charge), _format_mwh(design)])
+
+            estimate_rows.append([
+                period,
+                _format_hms(_life_estimate(active_dc, active_energy, full_charge)),
+                _standby_estimate(standby_dc, standby_energy, full_charge),
+                _format_hms(_life_estimate(active_dc, active_energy, design)),
+                _standby_estimate(standby_dc, standby_energy, design),
+            ])
+
+        elif tag == "SystemInformation":
+            fields = {_xml_tag(child): (child.text or "").strip() for child in element}
+            found = {
+                "Computer Name": fields.get("ComputerName"),
+                "System Product Name": " ".join(filter(None, [fields.get("SystemManufacturer"), fields.get("SystemProductName")])),
+                "OS Build": fields.get("OSBuild"),
+                "BIOS": " ".join(filter(None, [fields.get("BIOSVersion"), fields.get("BIOSDate")])),
+            }
+            system_info.update({key: value for key, value in found.items() if value})
+
+        elif tag == "LocalScanTime":
+            system_info["Report Time"] = _format_timestamp(element.text)
+
+        elif tag == "Battery" and not battery_read:
+            # Only the first battery is reported, like in the HTML path
+            battery_read = True
+            fields = {_xml_tag(child): (child.text or "").strip() for child in element}
+            found = {
+                "Battery Name": fields.get("Id"),
+                "Manufacturer": fields.get("Manufacturer"),
+                "Chemistry": fields.get("Chemistry"),
+                "Design Capacity": _format_mwh(fields["DesignCapacity"]) if fields.get("DesignCapacity") else None,
+                "Full Charge Capacity": _format_mwh(fields["FullChargeCapacity"]) if fields.get("FullChargeCapacity") else None,
+            }
+            battery_details.update({key: value for key, value in found.items() if value})
+
+        else:
+            continue
+
+        # Drop parsed entries so memory stays flat on long reports
+        if stack:
+            stack[-1].clear()
+
+    return ReportTables(
+        system_info,
+        battery_details,
+        pd.DataFrame(recent_rows, columns=["START TIME", "STATE", "SOURCE", "CAPACITY REMAINING PERCENT", "CAPACITY REMAINING"]),
+        pd.DataFrame(battery_rows, columns=["START TIME", "STATE", "DURATION", "ENERGY DRAINED PERCENT", "ENERGY DRAINED"]),
+        pd.DataFrame(history_rows, columns=[
+            "PERIOD",
+            "BATTERY DURATION ACTIVE",
+            "BATTERY DURATION CONNECTED STANDBY",
+            "AC DURATION ACTIVE",
+            "AC DURATION CONNECTED STANDBY",
+        ]),
+        pd.DataFrame(capacity_rows, columns=["PERIOD", "FULL CHARGE CAPACITY", "DESIGN CAPACITY"]),
+        pd.DataFrame(estimate_rows, columns=[
+            "PERIOD",
+            "AT FULL CHARGE ACTIVE",
+            "AT FULL CONNECTED STANDBY",
+            "AT DESIGN CAPACITY ACTIVE",
+            "AT DESIGN CAPACITY CONNECTED STANDBY",
+        ]),
+    )
+
+# Patterns are applied column-wise through the .str accessor, kept as plain
+# strings so pandas can run them natively instead of per element in Python
+DATE_TIME_GLUED = r"(\d{4}-\d{2}-\d{2})(\d{2}:\d{2}:\d{2})"
+TIME_PERCENTAGE = r"(\d+:\d{2}:\d{2})\s*(\d+)%?"
+DURATION = r"^(?:(\d+):)?(\d+):(\d{2}):(\d{2})$"
+START_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-# Apply the function
-recent_usage["START TIME"] = fill_missing_dates(recent_usage["START TIME"])
+def fill_missing_dates(times):
+    """Prepends the last seen date to entries that only hold a time."""
+    has_date = times.str.contains(" ", regex=False)
+    last_date = times.str.replace(r"(?s) .*", "", regex=True).where(has_date).ffill()
+    return times.where(has_date | last_date.isna(), last_date + " " + times)
+
+def parse_start_times(times):
+    """Turns raw START TIME cells into datetimes, fixing glued and date-less entries."""
+    # Fix missing spaces between date and time
+    times = times.astype(str).str.replace(DATE_TIME_GLUED, r"\1 \2", regex=True)
+    times = fill_missing_dates(times)
+    return pd.to_datetime(times, format=START_TIME_FORMAT, errors="coerce")
 
-# Convert to proper datetime format
-recent_usage["START TIME"] = pd.to_datetime(recent_usage["START TIME"], errors="coerce")
+def extract_time_percentage(column):
+    """Splits 'h:mm:ss N %' cells into time and percentage columns, empty when absent."""
+    parts = column.astype(str).str.extract(TIME_PERCENTAGE).fillna("")
+    return parts[0], parts[1]
 
-# Split 'START TIME' into separate 'DATE' and 'TIME' columns
-recent_usage["DATE"] = recent_usage["START TIME"].dt.date
-recent_usage["TIME"] = recent_usage["START TIME"].dt.time
+def parse_durations(column):
+    """Converts '[d:]h:mm:ss' cells to whole seconds, cells without a duration become <NA>."""
+    parts = column.astype(str).str.strip().str.extract(DURATION).astype(float)
+    seconds = parts[0].fillna(0) * 86400 + parts[1] * 3600 + parts[2] * 60 + parts[3]
+    return seconds.astype("Int64")
 
-# Remove 'START TIME' and reorder columns
-recent_usage = recent_usage.drop(columns=["START TIME"])
-recent_usage = recent_usage[["DATE", "TIME"] + [col for col in recent_usage.columns if col not in ["DATE", "TIME"]]]
-recent_usage["CAPACITY REMAINING"] = recent_usage["CAPACITY REMAINING"].apply(clean_energy_value)
+def find_table_value(report, label):
+    """Finds the value next to a label in a table, handling missing elements safely."""
+    return report.find_value(label)
 
-recent_usage.to_csv(dir_path.capitalize() + r"\battery-report\recent_usage.csv", index=False)
+def extract_table(report, section_header):
+    """Extracts table data under a given section header."""
+    table = report.find_table(section_header)
+    if not table:
+        return pd.DataFrame()
 
-battery_usage.columns = [
-    "START TIME",
-    "STATE",
-    "DURATION",
-    "ENERGY DRAINED PERCENT",
-    "ENERGY DRAINED"
-]
-# Fix missing spaces between date and time
-battery_usage["START TIME"] = battery_usage["START TIME"].astype(str).apply(
-    lambda x: re.sub(r'(\d{4}-\d{2}-\d{2})(\d{2}:\d{2}:\d{2})', r'\1 \2', x)
-)
+    headers, rows = table
+    max_columns = max(len(row) for row in rows) if rows else 0
+    if not headers or len(headers) != max_columns:
+        headers = [f"Column_{i+1}" for i in range(max_columns)]
 
-# Apply the function
-battery_usage["START TIME"] = fill_missing_dates(battery_usage["START TIME"])
+    return pd.DataFrame(rows, columns=headers)
 
-# Convert to proper datetime format
-battery_usage["START TIME"] = pd.to_datetime(battery_usage["START TIME"], errors="coerce")
+def clean_energy_values(column):
+    """Cleans energy values by removing 'mWh', commas, and converting to numeric."""
+    cleaned = (
+        column.astype(str)
+        .str.replace("mWh", "", regex=False)
+        .str.replace(",", "", regex=False)
+        .str.strip()
+        .str.strip('"')
+    )
+    # Unparseable values become 0, missing cells stay missing
+    return pd.to_numeric(cleaned, errors="coerce").astype(float).fillna(0).where(column.notna())
+
+def _timed_extract_table(report, section_header, name):
+    with instrumentation.stage("extract_table", table=name) as stage:
+        df = extract_table(report, section_header)
+        stage.rows = len(df)
+    return df
 
-# Split 'START TIME' into separate 'DATE' and 'TIME' columns
-battery_usage["DATE"] = battery_usage["START TIME"].dt.date
-battery_usage["TIME"] = battery_usage["START TIME"].dt.time
+# Section header, dropped column and column names of each table of the HTML report
+HTML_TABLES = {
+    "recent_usage": ("Recent usage", None, [
+        "START TIME",
+        "STATE",
+        "SOURCE",
+        "CAPACITY REMAINING PERCENT",
+        "CAPACITY REMAINING"
+    ]),
+    "battery_usage": ("Battery usage", None, [
+        "START TIME",
+        "STATE",
+        "DURATION",
+        "ENERGY DRAINED PERCENT",
+        "ENERGY DRAINED"
+    ]),
+    "usage_history": ("Usage history", 3, [
+        "PERIOD",
+        "BATTERY DURATION ACTIVE",
+        "BATTERY DURATION CONNECTED STANDBY",
+        "AC DURATION ACTIVE",
+        "AC DURATION CONNECTED STANDBY",
+    ]),
+    "battery_capacity_history": ("Battery capacity history", None, ["PERIOD", "FULL CHARGE CAPACITY", "DESIGN CAPACITY"]),
+    "battery_life_estimates": ("Battery life estimates", 3, [
+        "PERIOD",
+        "AT FULL CHARGE ACTIVE",
+        "AT FULL CONNECTED STANDBY",
+        "AT DESIGN CAPACITY ACTIVE",
+        "AT DESIGN CAPACITY CONNECTED STANDBY"
+    ]),
+}
 
-battery_usage = battery_usage.drop(columns=["START TIME"])
-battery_usage = battery_usage[["DATE", "TIME"] + [col for col in battery_usage.columns if col not in ["DATE", "TIME"]]]
-battery_usage["ENERGY DRAINED"] = battery_usage["ENERGY DRAINED"].apply(clean_energy_value)
+def read_html_data(data, names=TABLE_NAMES):
+    """Scrapes raw HTML report bytes into (system_info, battery_details, {name: raw table}) for the named tables.
+
+    data may also be a part of a report, as long as it holds the sections of those tables.
+    """
+    with instrumentation.stage("parse", bytes=len(data)) as stage:
+        report = build_report_index(data)
+        stage.annotate(backend=report.backend)
+
+    system_info = {
+        "Computer Name": find_table_value(report, "COMPUTER NAME"),
+        "System Product Name": find_table_value(report, "SYSTEM PRODUCT NAME"),
+        "OS Build": find_table_value(report, "OS BUILD"),
+        "BIOS": find_table_value(report, "BIOS"),
+        "Report Time": find_table_value(report, "REPORT TIME")
+    }
+
+    battery_details = {
+        "Battery Name": find_table_value(report, "NAME"),
+        "Manufacturer": find_table_value(report, "MANUFACTURER"),
+        "Chemistry": find_table_value(report, "CHEMISTRY"),
+        "Design Capacity": find_table_value(report, "DESIGN CAPACITY"),
+        "Full Charge Capacity": find_table_value(report, "FULL CHARGE CAPACITY"),
+    }
+
+    tables = {}
+    for name in names:
+        section_header, dropped_column, columns = HTML_TABLES[name]
+        df = _timed_extract_table(report, section_header, name)
+        if dropped_column is not None:
+            df.drop(df.columns[dropped_column], axis=1, inplace=True)
+        df.columns = columns
+        tables[name] = df
+    return system_info, battery_details, tables
+
+def read_html_report(path):
+    """Scrapes an HTML battery report into raw ReportTables, like read_xml_report."""
+    with open(path, "rb") as file:
+        system_info, battery_details, tables = read_html_data(file.read())
+    return ReportTables(system_info, battery_details, **tables)
+
+def read_report(path):
+    """Parses an XML or HTML battery report, chosen by file extension, without cleaning."""
+    if path.lower().endswith(".xml"):
+        with instrumentation.stage("read_xml_report", path=path) as stage:
+            raw = read_xml_report(path)
+            stage.rows = len(raw.recent_usage)
+        return raw
+    return read_html_report(path)
+
+def split_start_time(df):
+    """Replaces the raw START TIME column with leading DATE and TIME columns."""
+    # Convert to proper datetime format
+    df["START TIME"] = parse_start_times(df["START TIME"])
+
+    # Split 'START TIME' into separate 'DATE' and 'TIME' columns
+    df["DATE"] = df["START TIME"].dt.date
+    df["TIME"] = time_of_day(df["START TIME"])
+
+    # Remove 'START TIME' and reorder columns
+    df = df.drop(columns=["START TIME"])
+    return df[["DATE", "TIME"] + [col for col in df.columns if col not in ["DATE", "TIME"]]]
+
+def clean_recent_usage(recent_usage):
+    recent_usage = split_start_time(recent_usage)
+    recent_usage["CAPACITY REMAINING"] = clean_energy_values(recent_usage["CAPACITY REMAINING"])
+    return recent_usage
+
+def clean_battery_usage(battery_usage):
+    battery_usage = split_start_time(battery_usage)
+    battery_usage["ENERGY DRAINED"] = clean_energy_values(battery_usage["ENERGY DRAINED"])
+    battery_usage["DURATION"] = parse_durations(battery_usage["DURATION"])
+    return battery_usage
+
+PERIOD_DATE_FORMAT = "%Y-%m-%d"
 
-battery_usage.to_csv(dir_path.capitalize() + r"\battery-report\battery_usage.csv", index=False)
+def clean_and_fix_period(df, period_column="PERIOD"):
+    """Normalizes PERIOD to 'start - end' and adds typed PERIOD_START/PERIOD_END columns."""
+    # Clean up the PERIOD column by removing extra newlines and spaces
+    period = df[period_column].str.replace(r"\s*\n+\s*", " ", regex=True).str.strip()
+    start = period.str.replace(r"(?s) - .*", "", regex=True)
+
+    # Rows with only one date end where the next row's period starts
+    single_date_rows = period.str.match(r"^\d{4}-\d{2}-\d{2}$", na=False)
+    next_start = start.shift(-1)
+    period = period.where(~single_date_rows | next_start.isna(), period + " - " + next_start)
+
+    # The last period always covers a single day
+    start_dates = pd.to_datetime(start, format=PERIOD_DATE_FORMAT, errors="coerce")
+    if len(period) and pd.notna(start_dates.iloc[-1]):
+        next_day = start_dates.iloc[-1] + pd.Timedelta(days=1)
+        period.iloc[-1] = f"{start.iloc[-1]} - {next_day.strftime(PERIOD_DATE_FORMAT)}"
+
+    df[period_column] = period
+    end = period.str.extract(r" - (\d{4}-\d{2}-\d{2})$")[0]
+    df.insert(df.columns.get_loc(period_column) + 1, "PERIOD_START", start_dates)
+    df.insert(df.columns.get_loc(period_column) + 2, "PERIOD_END",
+              pd.to_datetime(end, format=PERIOD_DATE_FORMAT, errors="coerce"))
+    return df
 
-usage_history.drop(usage_history.columns[3], axis=1, inplace=True)
-usage_history.columns = [
-    "PERIOD",
+# Duration columns are stored as whole seconds
+USAGE_HISTORY_DURATIONS = [
     "BATTERY DURATION ACTIVE",
     "BATTERY DURATION CONNECTED STANDBY",
     "AC DURATION ACTIVE",
     "AC DURATION CONNECTED STANDBY",
 ]
-def clean_and_fix_period(df, period_column="PERIOD"):
-    # Clean up the PERIOD column by removing extra newlines and spaces
-    df[period_column] = df[period_column].str.replace(r"\s*\n+\s*", " ", regex=True).str.strip()
-
-    # Identify rows where PERIOD has only one date
-    single_date_rows = df[period_column].str.match(r"^\d{4}-\d{2}-\d{2}$", na=False)
-
-    # Fill in missing end dates by using the next row's start date, if available
-    for i in df[single_date_rows].index:
-        if i + 1 in df.index:  # Ensure the next row exists
-            next_date = df.loc[i + 1, period_column].split(" - ")[0]  # Get start date of next period
-            df.loc[i, period_column] = f"{df.loc[i, period_column]} - {next_date}"
-
-    # Recalculate the last index
-    last_index = df.index[-1]
-
-    # Extract the last start date from the PERIOD column (handling cases with ranges)
-    last_date_str = df.loc[last_index, period_column].split(" - ")[0]  # Take only the first date
-
-    # Function to manually increment a date
-    def increment_date(date_str):
-        year, month, day = map(int, date_str.split("-"))
-        days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-        if (year % 4 == 0 and year % 100 != 0) or (year % 400 == 0):
-            days_in_month[1] = 29  # Leap year adjustment
-        day += 1
-        if day > days_in_month[month - 1]:
-            day = 1
-            month += 1
-            if month > 12:
-                month = 1
-                year += 1
-        return f"{year:04d}-{month:02d}-{day:02d}"
-
-    # Compute the next day manually
-    next_day_str = increment_date(last_date_str)
-
-    # Update the last row with the calculated next day
-    df.loc[last_index, period_column] = f"{last_date_str} - {next_day_str}"
-
-    return df
-usage_history = clean_and_fix_period(usage_history)
-usage_history.to_csv(dir_path.capitalize() + r"\battery-report\usage_history.csv", index=False)
-
-battery_capacity_history.columns = ["PERIOD", "FULL CHARGE CAPACITY", "DESIGN CAPACITY"]
-battery_capacity_history = clean_and_fix_period(battery_capacity_history)
-battery_capacity_history["FULL CHARGE CAPACITY"] = battery_capacity_history["FULL CHARGE CAPACITY"].apply(clean_energy_value)
-battery_capacity_history["DESIGN CAPACITY"] = battery_capacity_history["DESIGN CAPACITY"].apply(clean_energy_value)
-
-
-battery_capacity_history.to_csv(dir_path.capitalize() + r"\battery-report\battery_capacity_history.csv", index=False)
-
-battery_life_estimates.drop(battery_life_estimates.columns[3], axis=1, inplace=True)
-battery_life_estimates.columns = [
-    "PERIOD",
+LIFE_ESTIMATE_DURATIONS = [
     "AT FULL CHARGE ACTIVE",
-    "AT FULL CONNECTED STANDBY",
+    "CONNECTED_STANDBY_TIME",
     "AT DESIGN CAPACITY ACTIVE",
-    "AT DESIGN CAPACITY CONNECTED STANDBY"
-]
-battery_life_estimates = clean_and_fix_period(battery_life_estimates)
-battery_life_estimates["CONNECTED_STANDBY_TIME"], battery_life_estimates["CONNECTED_STANDBY_PERCENT"] = extract_time_percentage(
-    battery_life_estimates["AT FULL CONNECTED STANDBY"]
-)
-battery_life_estimates["DESIGN_CONNECTED_STANDBY_TIME"], battery_life_estimates["DESIGN_CONNECTED_STANDBY_PERCENT"] = extract_time_percentage(
-    battery_life_estimates["AT DESIGN CAPACITY CONNECTED STANDBY"]
-)
-battery_life_estimates.drop(['AT FULL CONNECTED STANDBY', 'AT DESIGN CAPACITY CONNECTED STANDBY'], axis=1, inplace=True)
-
-# Reorder the columns as requested
-new_column_order = [
-    'PERIOD',
-    'AT FULL CHARGE ACTIVE',
-    'CONNECTED_STANDBY_TIME',
-    'CONNECTED_STANDBY_PERCENT',
-    'AT DESIGN CAPACITY ACTIVE',
-    'DESIGN_CONNECTED_STANDBY_TIME',
-    'DESIGN_CONNECTED_STANDBY_PERCENT'
+    "DESIGN_CONNECTED_STANDBY_TIME",
 ]
-battery_life_estimates = battery_life_estimates[new_column_order]
 
-battery_life_estimates.to_csv(dir_path.capitalize() + r"\battery-report\battery_life_estimates.csv", index=False)
+def clean_usage_history(usage_history):
+    usage_history = clean_and_fix_period(usage_history)
+    usage_history[USAGE_HISTORY_DURATIONS] = usage_history[USAGE_HISTORY_DURATIONS].apply(parse_durations)
+    return usage_history
+
+def clean_battery_capacity_history(battery_capacity_history):
+    battery_capacity_history = clean_and_fix_period(battery_capacity_history)
+    battery_capacity_history["FULL CHARGE CAPACITY"] = clean_energy_values(battery_capacity_history["FULL CHARGE CAPACITY"])
+    battery_capacity_history["DESIGN CAPACITY"] = clean_energy_values(battery_capacity_history["DESIGN CAPACITY"])
+    return battery_capacity_history
+
+def clean_battery_life_estimates(battery_life_estimates):
+    battery_life_estimates = clean_and_fix_period(battery_life_estimates)
+    battery_life_estimates["CONNECTED_STANDBY_TIME"], battery_life_estimates["CONNECTED_STANDBY_PERCENT"] = extract_time_percentage(
+        battery_life_estimates["AT FULL CONNECTED STANDBY"]
+    )
+    battery_life_estimates["DESIGN_CONNECTED_STANDBY_TIME"], battery_life_estimates["DESIGN_CONNECTED_STANDBY_PERCENT"] = extract_time_percentage(
+        battery_life_estimates["AT DESIGN CAPACITY CONNECTED STANDBY"]
+    )
+    battery_life_estimates.drop(['AT FULL CONNECTED STANDBY', 'AT DESIGN CAPACITY CONNECTED STANDBY'], axis=1, inplace=True)
+
+    # Reorder the columns as requested
+    new_column_order = [
+        'PERIOD',
+        'PERIOD_START',
+        'PERIOD_END',
+        'AT FULL CHARGE ACTIVE',
+        'CONNECTED_STANDBY_TIME',
+        'CONNECTED_STANDBY_PERCENT',
+        'AT DESIGN CAPACITY ACTIVE',
+        'DESIGN_CONNECTED_STANDBY_TIME',
+        'DESIGN_CONNECTED_STANDBY_PERCENT'
+    ]
+    battery_life_estimates = battery_life_estimates[new_column_order]
+    battery_life_estimates[LIFE_ESTIMATE_DURATIONS] = battery_life_estimates[LIFE_ESTIMATE_DURATIONS].apply(parse_durations)
+    return battery_life_estimates
+
+TABLE_CLEANERS = {
+    "recent_usage": clean_recent_usage,
+    "battery_usage": clean_battery_usage,
+    "usage_history": clean_usage_history,
+    "battery_capacity_history": clean_battery_capacity_history,
+    "battery_life_estimates": clean_battery_life_estimates,
+}
 
-print("Extraction Complete! Data Saved as CSV Files.")
-print(system_info)
-print(battery_details)
\ No newline at end of file
+class ExtractionCancelled(Exception):
+    """Raised at the next stage of an extraction once it has been cancelled."""
+
+def report_stage(stage, progress=None, cancel=None):
+    """Announces a pipeline stage, first stopping the run if cancel (a threading.Event) is set."""
+    if cancel is not None and cancel.is_set():
+        raise ExtractionCancelled(f"Cancelled before {stage}")
+    if progress is not None:
+        progress(stage)
+
+def clean_report(raw, progress=None, cancel=None, names=None):
+    """Returns new ReportTables with the raw tables cleaned and typed like read_table returns them.
+
+    With names, only those tables are cleaned and the others are kept as they are.
+    """
+    tables = {}
+    for name, clean in TABLE_CLEANERS.items():
+        if names is not None and name not in names:
+            tables[name] = getattr(raw, name)
+            continue
+        report_stage(f"cleaning {name}", progress, cancel)
+        with instrumentation.stage("clean", table=name) as stage:
+            tables[name] = normalize_table(clean(getattr(raw, name)), name)
+            stage.rows = len(tables[name])
+    return ReportTables(raw.system_info, raw.battery_details, **tables)
+
+def extract_report(path):
+    """Parses and cleans a battery report that already exists on disk into ReportTables."""
+    return clean_report(read_report(path))
+
+def run_powercfg(command, timeout=GENERATE_TIMEOUT, cancel=None):
+    """Runs a powercfg command, killing it once timeout seconds pass or cancel is set."""
+    process = subprocess.Popen(command, shell=True)
+    deadline = time.monotonic() + timeout
+    while process.poll() is None:
+        if cancel is not None and cancel.is_set():
+            process.kill()
+            process.wait()
+            raise ExtractionCancelled("Cancelled while generating the report")
+        if time.monotonic() > deadline:
+            process.kill()
+            process.wait()
+            raise subprocess.TimeoutExpired(command, timeout)
+        time.sleep(0.1)
+    return process.returncode
+
+def generate_report(report_dir, timeout=GENERATE_TIMEOUT, cancel=None):
+    """Runs powercfg and returns the path of the new report, preferring the XML format."""
+    os.makedirs(report_dir, exist_ok=True)
+    xml_path = os.path.join(report_dir, os.path.basename(xml_file_path))
+    html_path = os.path.join(report_dir, os.path.basename(file_path))
+
+    if REPORT_SOURCE:
+        # Stand-in for powercfg: copy the configured report into place
+        target = xml_path if REPORT_SOURCE.lower().endswith(".xml") else html_path
+        shutil.copyfile(REPORT_SOURCE, target)
+        return target
+
+    # Prefer the structured XML report, the HTML report is the fallback
+    run_powercfg(f'powercfg /batteryreport /output "{xml_path}" /xml', timeout, cancel)
+    if os.path.exists(xml_path):
+        return xml_path
+
+    command = f'powercfg /batteryreport /output "{html_path}"'
+    run_powercfg(command, timeout, cancel)
+    return html_path
+
+def write_tables(report, report_dir, output_format=OUTPUT_FORMAT, names=None):
+    """Writes the info dicts and the tables of a ReportTables to report_dir, or only the named ones."""
+    os.makedirs(report_dir, exist_ok=True)
+    tables = {
+        "system_info": pd.DataFrame([report.system_info]),
+        "battery_details": pd.DataFrame([report.battery_details]),
+        **report.tables,
+        **session_analytics.derived_tables(report),
+    }
+    for name, df in tables.items():
+        if names is not None and name not in names:
+            continue
+        with instrumentation.stage("write_table", table=name, format=output_format) as stage:
+            write_table(df, name, report_dir, output_format)
+            stage.rows = len(df)
+
+def save_history(report, history_path=HISTORY_PATH, names=None):
+    """Merges a report, or only its named tables, into the deduplicated long-term history."""
+    with instrumentation.stage("save_history") as stage:
+        history = history_store.connect(history_path)
+        try:
+            device = report.system_info["Computer Name"]
+            tables = {name: df for name, df in report.tables.items() if names is None or name in names}
+            counts = history_store.upsert_tables(history, tables, device)
+            if "battery_capacity_history" in tables:
+                wear_model.update(history, report.battery_capacity_history, device)
+            rollups.update(history, tables, device)
+        finally:
+            history.close()
+        stage.rows = sum(counts.values())
+    return counts
+
+# Outputs of each report table, a table and the tables derived from it are reused together
+TABLE_OUTPUTS = {
+    name: [name, *(derived for derived, (source, _) in session_analytics.DERIVED_TABLES.items() if source == name)]
+    for name in TABLE_NAMES
+}
+INFO_OUTPUTS = ["system_info", "battery_details"]
+
+def _previous_info(report_dir):
+    """The system info and battery details dicts written by the last run, values as the text first extracted."""
+    # 'N/A' is a value of the report, and an empty value is stored as missing
+    return [read_table(name, report_dir, keep_default_na=False).fillna("").iloc[0].to_dict() for name in INFO_OUTPUTS]
+
+def extract_changed(path, report_dir=report_dir, output_format=OUTPUT_FORMAT, progress=None, cancel=None,
+                    history_path=HISTORY_PATH):
+    """Extracts a report, reprocessing only the sections whose content changed since the last run.
+
+    Every section of the report is fingerprinted: the h2 sections of the raw HTML,
+    which are parsed only when changed, or the raw tables of an XML report, which
+    is skipped entirely when the file is unchanged. Unchanged tables are loaded
+    from the outputs of the last run in report_dir.
+
+    Returns the ReportTables, the names of the outputs to write and the manifest
+    to save once they are written.
+    """
+    manifest = report_cache.load_manifest(report_dir) if REPORT_CACHE else {}
+    source = "xml" if path.lower().endswith(".xml") else "html"
+    with instrumentation.stage("fingerprint", path=path) as stage, open(path, "rb") as file:
+        data = file.read()
+        if source == "html":
+            headers = {name: header for name, (header, _, _) in HTML_TABLES.items()}
+            parts = report_cache.html_sections(data, headers)
+            info = b"".join(part for key, part in parts if key == report_cache.INFO)
+            fingerprints = {key: report_cache.fingerprint(part) for key, part in parts}
+            fingerprints[report_cache.INFO] = report_cache.fingerprint(info)
+        else:
+            fingerprints = {"report": report_cache.fingerprint(data)}
+        stage.annotate(bytes=len(data))
+
+    # The history and the outputs of other sources or devices do not cover this report
+    if manifest.get("source") != source or manifest.get("history") != history_path or not os.path.exists(history_path):
+        manifest = {}
+
+    def unchanged(key, names):
+        return report_cache.reusable(manifest, key, fingerprints.get(key), report_dir, output_format, names)
+
+    if source == "html":
+        changed = [name for name in TABLE_NAMES if not unchanged(name, TABLE_OUTPUTS[name])]
+        if changed or not unchanged(report_cache.INFO, INFO_OUTPUTS):
+            # Sections are parsed on their own, with the info sections for the values outside tables
+            subset = b"".join(part for key, part in parts if key == report_cache.INFO or key in changed)
+            system_info, battery_details, raw = read_html_data(subset, changed)
+            if system_info["Computer Name"] != manifest.get("device") and len(changed) < len(TABLE_NAMES):
+                changed = TABLE_NAMES
+                system_info, battery_details, raw = read_html_data(data)
+            info_changed = True
+        else:
+            system_info, battery_details = _previous_info(report_dir)
+            raw, info_changed = {}, False
+    else:
+        if unchanged("report", [*INFO_OUTPUTS, *(output for name in TABLE_NAMES for output in TABLE_OUTPUTS[name])]):
+            changed, raw, info_changed = [], {}, False
+            system_info, battery_details = _previous_info(report_dir)
+            # The table fingerprints are those of the identical report read last time
+            fingerprints = {**manifest["sections"], **fingerprints}
+        else:
+            report = read_report(path)
+            system_info, battery_details, raw = report.system_info, report.battery_details, report.tables
+            info_changed = True
+            fingerprints.update({name: report_cache.frame_fingerprint(df) for name, df in raw.items()})
+            changed = [name for name in TABLE_NAMES if not unchanged(name, TABLE_OUTPUTS[name])]
+            if system_info["Computer Name"] != manifest.get("device"):
+                changed = TABLE_NAMES
+
+    tables = {name: raw[name] if name in changed else read_table(name, report_dir) for name in TABLE_NAMES}
+    report = clean_report(ReportTables(system_info, battery_details, **tables), progress, cancel, changed)
+    for name in TABLE_NAMES:
+        if name not in changed:
+            report.derived.update({output: read_table(output, report_dir) for output in TABLE_OUTPUTS[name][1:]})
+
+    written = [output for name in changed for output in TABLE_OUTPUTS[name]]
+    if info_changed:
+        # Also when no table changed, e.g. only the report time in the header did
+        written = [*INFO_OUTPUTS, *written]
+    manifest = {
+        "source": source,
+        "format": output_format,
+        "device": system_info["Computer Name"],
+        "history": history_path,
+        "sections": fingerprints,
+    }
+    return report, written, manifest
+
+def run_extraction(report_dir=report_dir, output_format=OUTPUT_FORMAT, progress=None, cancel=None,
+                   timeout=GENERATE_TIMEOUT, history_path=HISTORY_PATH):
+    """Generates a fresh report, extracts it, writes the outputs and returns the ReportTables.
+
+    progress is called with the name of each stage as it starts. Setting the cancel
+    event stops the run at the next stage with ExtractionCancelled.
+    """
+    try:
+        with instrumentation.stage("extraction"):
+            report_stage("generating", progress, cancel)
+            with instrumentation.stage("generate_report"):
+                path = generate_report(report_dir, timeout, cancel)
+            report_stage("parsing", progress, cancel)
+            report, written, manifest = extract_changed(path, report_dir, output_format, progress, cancel,
+                                                         history_path)
+            report_stage("analysing sessions", progress, cancel)
+            session_analytics.derived_tables(report)
+            report_stage("writing", progress, cancel)
+            # Outputs being replaced are no longer those of the fingerprints on disk
+            report_cache.clear_manifest(report_dir)
+            write_tables(report, report_dir, output_format, written)
+            report_stage("saving history", progress, cancel)
+            save_history(report, history_path, written)
+            report_cache.save_manifest(report_dir, manifest)
+    finally:
+        # Also written for failed runs, the last stage shows where it stopped
+        instrumentation.write(os.path.join(report_dir, PROFILE_NAME))
+    return report
+
+if __name__ == "__main__":
+    report = run_extraction()
+
+    print("Extraction Complete! Data Saved as CSV Files.")
+    print(report.system_info)
+    print(report.battery_details)
@@ -0,0 +1,66 @@
+import queue
+import threading
+import time
+import extract
+
+class ExtractionJob:
+    """Runs extract.run_extraction on a worker thread and queues its progress for the GUI.
+
+    Tk widgets may only be touched from the main thread, so the worker never calls
+    back into the GUI: it queues ("stage", name), then one of ("done", ReportTables),
+    ("cancelled", message) or ("error", exception), and the GUI drains them with poll().
+    """
+
+    def __init__(self, timeout=None, **options):
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.timeout = timeout
+        self.timed_out = False
+        self.started = None
+        self.options = options
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = time.monotonic()
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Asks the worker to stop at its next stage, or kills a running powercfg."""
+        self.cancel_event.set()
+
+    def _run(self):
+        try:
+            report = extract.run_extraction(
+                progress=lambda stage: self.events.put(("stage", stage)),
+                cancel=self.cancel_event,
+                **self.options,
+            )
+        except extract.ExtractionCancelled as e:
+            message = f"Timed out after {self.timeout:g}s" if self.timed_out else str(e)
+            self.events.put(("cancelled", message))
+        except Exception as e:
+            self.events.put(("error", e))
+        else:
+            self.events.put(("done", report))
+
+    def poll(self):
+        """Returns the events queued since the last poll, cancelling the job once it overruns its timeout."""
+        if self.timeout is not None and not self.cancel_event.is_set() and time.monotonic() - self.started > self.timeout:
+            self.timed_out = True
+            self.cancel()
+
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+if __name__ == "__main__":
+    # Runs one extraction from the command line, printing the stages as the GUI would see them
+    job = ExtractionJob().start()
+    while job.thread.is_alive() or not job.events.empty():
+        for kind, value in job.poll():
+            print(kind, value if kind != "done" else value.system_info)
+        time.sleep(0.1)
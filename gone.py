@@ -1,11 +1,10 @@
 import os
+import retention
 
+# Explicit purge of the extracted report; outputs otherwise stay within the retention budget
 dir_path = os.path.dirname(os.path.abspath(__file__))
-folder_path = dir_path.capitalize() + r"\battery-report"  # Change this path accordingly
+folder_path = os.path.join(dir_path, "battery-report")
 
-for file_name in os.listdir(folder_path):
-    file_path = os.path.join(folder_path, file_name)
-    if os.path.isfile(file_path):
-        os.remove(file_path)
+freed = retention.purge({folder_path: True})
 
-print("All files deleted successfully.")
\ No newline at end of file
+print(f"All files deleted successfully ({freed / 1024 / 1024:.2f} MB freed).")
@@ -0,0 +1,129 @@
+import sqlite3
+import pandas as pd
+from report_io import TABLE_SCHEMAS, apply_schema, format_time_of_day, start_times, time_of_day
+
+# Tables kept across reports and the time column that identifies a row of a device.
+# A later report replaces the rows it shares with an earlier one. Usage entries
+# also have a SEQUENCE, their position among the entries of the same second, so
+# entries of one second (e.g. a source and a state change) are all kept.
+HISTORY_KEYS = {
+    "recent_usage": "START_TIME",
+    "battery_usage": "START_TIME",
+    "usage_history": "PERIOD_START",
+    "battery_capacity_history": "PERIOD_START",
+    "battery_life_estimates": "PERIOD_START",
+}
+
+SQL_TYPES = {"string": "TEXT", "float": "REAL", "int": "INTEGER", "date": "TEXT", "time": "TEXT", "datetime": "TEXT"}
+
+def _history_columns(name):
+    """Stored columns of a history table: the device, the key, then the report columns."""
+    columns = {"DEVICE": "string"}
+    if HISTORY_KEYS[name] == "START_TIME":
+        columns["START_TIME"] = "string"
+        columns["SEQUENCE"] = "int"
+    columns.update(TABLE_SCHEMAS[name])
+    return columns
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+def _primary_key(name):
+    key = HISTORY_KEYS[name]
+    return f"DEVICE, {key}, SEQUENCE" if key == "START_TIME" else f"DEVICE, {key}"
+
+def _migrate(conn, name):
+    """Moves a usage table of a store written before SEQUENCE into the current layout, as sequence 0."""
+    stored = [row[1] for row in conn.execute(f"PRAGMA table_info({name})")]
+    if not stored or "SEQUENCE" in stored or HISTORY_KEYS[name] != "START_TIME":
+        return
+    with conn:
+        conn.execute(f"DROP INDEX IF EXISTS idx_{name}_time")
+        conn.execute(f"ALTER TABLE {name} RENAME TO {name}_old")
+        _create(conn, name)
+        columns = ", ".join(map(_quote, stored))
+        conn.execute(f"INSERT INTO {name} ({columns}, SEQUENCE) SELECT {columns}, 0 FROM {name}_old")
+        conn.execute(f"DROP TABLE {name}_old")
+
+def _create(conn, name):
+    key = HISTORY_KEYS[name]
+    columns = ", ".join(f"{_quote(column)} {SQL_TYPES[kind]}" for column, kind in _history_columns(name).items())
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {name} ({columns}, PRIMARY KEY ({_primary_key(name)}))")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_time ON {name} ({key})")
+    if key == "PERIOD_START":
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_end ON {name} (PERIOD_END)")
+
+def connect(path):
+    """Opens the history store, creating the tables and their time indexes if needed."""
+    conn = sqlite3.connect(path)
+    for name in HISTORY_KEYS:
+        _migrate(conn, name)
+        _create(conn, name)
+    conn.commit()
+    return conn
+
+def _to_rows(df, name, device):
+    """Converts a report table to SQLite rows with ISO date/time text and None for missing values."""
+    df = df.copy()
+    schema = TABLE_SCHEMAS[name]
+    if HISTORY_KEYS[name] == "START_TIME":
+        df["START_TIME"] = start_times(df).dt.strftime("%Y-%m-%d %H:%M:%S")
+        df["SEQUENCE"] = df.groupby("START_TIME", dropna=False).cumcount()
+    for column, kind in schema.items():
+        if column not in df.columns:
+            df[column] = None
+        elif kind == "date":
+            df[column] = pd.to_datetime(df[column]).dt.strftime("%Y-%m-%d")
+        elif kind == "time":
+            df[column] = format_time_of_day(time_of_day(df[column]))
+    df["DEVICE"] = device
+
+    # Rows without a usable time cannot be deduplicated and are not kept
+    df = df[df[HISTORY_KEYS[name]].notna()]
+    columns = list(_history_columns(name))
+    df = df[columns].astype(object)
+    return columns, df.where(df.notna(), None).itertuples(index=False, name=None)
+
+def upsert_tables(conn, tables, device):
+    """Inserts or replaces the rows of each report table for one device in a single transaction."""
+    counts = {}
+    with conn:
+        for name, df in tables.items():
+            if name not in HISTORY_KEYS or df.empty:
+                continue
+            columns, rows = _to_rows(df, name, device)
+            placeholders = ", ".join("?" for _ in columns)
+            cursor = conn.executemany(
+                f"INSERT OR REPLACE INTO {name} ({', '.join(map(_quote, columns))}) VALUES ({placeholders})",
+                rows,
+            )
+            counts[name] = cursor.rowcount
+    return counts
+
+def _time_text(value, key):
+    """Formats a range bound the way the key column is stored."""
+    timestamp = pd.Timestamp(value)
+    return timestamp.strftime("%Y-%m-%d" if key == "PERIOD_START" else "%Y-%m-%d %H:%M:%S")
+
+def query_table(conn, name, start=None, end=None, device=None):
+    """Returns the stored rows of a table within [start, end), optionally for one device.
+
+    Period tables match every period that overlaps the range.
+    """
+    key = HISTORY_KEYS[name]
+    conditions, params = [], []
+    if device is not None:
+        conditions.append("DEVICE = ?")
+        params.append(device)
+    if start is not None:
+        conditions.append("PERIOD_END > ?" if key == "PERIOD_START" else f"{key} >= ?")
+        params.append(_time_text(start, key))
+    if end is not None:
+        conditions.append(f"{key} < ?")
+        params.append(_time_text(end, key))
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    df = pd.read_sql_query(f"SELECT * FROM {name}{where} ORDER BY {_primary_key(name)}", conn, params=params)
+    if "START_TIME" in df.columns:
+        df["START_TIME"] = pd.to_datetime(df["START_TIME"], format="%Y-%m-%d %H:%M:%S")
+    return apply_schema(df, name)
@@ -0,0 +1,114 @@
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+# Set BATTERY_PROFILE=1 (or call enable()) to record wall time, CPU time and peak
+# memory of every stage. When off, stage() returns a shared no-op object.
+ENABLED = os.environ.get("BATTERY_PROFILE", "") not in ("", "0")
+
+_records = []
+_open_stages = []
+
+def enable():
+    """Turns recording on, also for worker processes started afterwards."""
+    global ENABLED
+    ENABLED = True
+    os.environ["BATTERY_PROFILE"] = "1"
+
+class Stage:
+    """Records one stage when used as a context manager; set .rows to the rows it handled."""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.rows = None
+        self.carried_peak = 0
+
+    def annotate(self, **fields):
+        """Adds fields to the record of this stage."""
+        self.fields.update(fields)
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        # The enclosing stage keeps the peak seen so far, this stage measures its own from here
+        if _open_stages:
+            _open_stages[-1].carried_peak = max(_open_stages[-1].carried_peak, peak)
+        tracemalloc.reset_peak()
+        _open_stages.append(self)
+        self.start_memory = current
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        peak = max(tracemalloc.get_traced_memory()[1], self.carried_peak)
+        _open_stages.pop()
+        if _open_stages:
+            _open_stages[-1].carried_peak = max(_open_stages[-1].carried_peak, peak)
+        else:
+            tracemalloc.stop()
+
+        _records.append({
+            "stage": self.name,
+            **self.fields,
+            "depth": len(_open_stages),
+            "rows": self.rows,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_memory_bytes": peak - self.start_memory,
+            "error": exc_type.__name__ if exc_type else None,
+        })
+        return False
+
+class _DisabledStage:
+    rows = None
+
+    def annotate(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+_DISABLED = _DisabledStage()
+
+def stage(name, **fields):
+    """Context manager timing a stage, e.g. with stage("clean", table="recent_usage") as s: ..."""
+    if not ENABLED:
+        return _DISABLED
+    return Stage(name, fields)
+
+def drain():
+    """Returns the stages recorded since the last drain or write and forgets them."""
+    records = list(_records)
+    _records.clear()
+    return records
+
+def write(path, append=False, stages=None):
+    """Writes stages (by default those recorded since the last write) as JSON.
+
+    Stages are listed in the order they finished, so nested stages come before their parent.
+    Does nothing when recording is off.
+    """
+    if not ENABLED:
+        return None
+
+    runs = []
+    if append and os.path.exists(path):
+        with open(path) as file:
+            runs = json.load(file)
+    stages = drain() if stages is None else stages
+    runs.append({"written": datetime.now().isoformat(timespec="seconds"), "pid": os.getpid(), "stages": stages})
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(runs, file, indent=2)
+    return path
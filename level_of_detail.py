@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+
+# Buckets averaged per drawn point before decimation picks the points that keep the shape
+BUCKETS_PER_POINT = 4
+
+# Drawn points per horizontal pixel of the axes
+POINTS_PER_PIXEL = 1
+
+def to_numbers(values):
+    """Converts a date, duration or numeric column to floats (matplotlib date numbers for dates), NaN for missing."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return mdates.date2num(values.to_numpy())
+    return values.to_numpy(dtype=float, na_value=np.nan)
+
+def bucket_means(x, y, buckets):
+    """Averages the points in each of `buckets` equal-width x ranges, dropping empty ones."""
+    width = (x[-1] - x[0]) / buckets or 1
+    index = np.minimum(((x - x[0]) / width).astype(np.int64), buckets - 1)
+    counts = np.bincount(index, minlength=buckets)
+    filled = counts > 0
+    mean_x = np.bincount(index, weights=x, minlength=buckets)[filled] / counts[filled]
+    mean_y = np.bincount(index, weights=y, minlength=buckets)[filled] / counts[filled]
+    return mean_x, mean_y
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: keeps `threshold` points that best preserve the line's shape."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # First and last points are kept, the rest is split into threshold - 2 buckets
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(np.int64), n)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_x = x[hi:edges[i + 2]].mean()
+        next_y = y[hi:edges[i + 2]].mean()
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + area.argmax()
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+def min_max(x, y, threshold):
+    """Keeps the lowest and highest point of each of threshold / 2 buckets, which preserves spikes."""
+    n = len(x)
+    if threshold >= n or threshold < 2:
+        return x, y
+
+    # Consecutive runs of `size` points, the last run padded with NaN to fill its row
+    size = -(-n // (threshold // 2))
+    rows = -(-n // size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, size)
+    offsets = np.arange(rows) * size
+    selected = np.unique(np.concatenate([offsets + np.nanargmin(padded, axis=1), offsets + np.nanargmax(padded, axis=1)]))
+    return x[selected], y[selected]
+
+DECIMATORS = {"lttb": lttb, "minmax": min_max}
+
+def level_of_detail(x, y, max_points, start=None, end=None, method="lttb"):
+    """Returns at most max_points of the sorted series (x, y) that fall within [start, end].
+
+    Dense ranges are first averaged per bucket, then decimated, so the cost depends on
+    the visible points and the result on the pixel budget, not on the history length.
+    min_max works on the raw points instead, averaging would flatten the spikes it keeps.
+    """
+    i0 = 0 if start is None else max(np.searchsorted(x, start) - 1, 0)
+    i1 = len(x) if end is None else min(np.searchsorted(x, end, side="right") + 1, len(x))
+    x, y = x[i0:i1], y[i0:i1]
+    if len(x) > max_points:
+        buckets = max_points * BUCKETS_PER_POINT
+        if len(x) > buckets and method != "minmax":
+            x, y = bucket_means(x, y, buckets)
+        x, y = DECIMATORS[method](x, y, max_points)
+    return x, y
+
+class LevelOfDetailLine:
+    """A line that redraws a decimated copy of its data whenever the visible x range changes."""
+
+    def __init__(self, ax, x, y, method="lttb", **line_options):
+        is_date = pd.api.types.is_datetime64_any_dtype(pd.Series(x))
+        x, y = to_numbers(x), to_numbers(y)
+        keep = ~(np.isnan(x) | np.isnan(y))
+        order = np.argsort(x[keep], kind="stable")
+        self.x, self.y = x[keep][order], y[keep][order]
+        self.ax = ax
+        self.method = method
+        self.line, = ax.plot([], [], **line_options)
+        if is_date:
+            ax.xaxis_date()
+
+        if len(self.x):
+            ax.update_datalim([(self.x[0], self.y.min()), (self.x[-1], self.y.max())])
+            ax.autoscale_view()
+        self.refresh()
+        # A plain function is held strongly by the callback registry, a bound method would not be
+        ax.callbacks.connect("xlim_changed", lambda ax: self.refresh())
+
+    def max_points(self):
+        """Pixel budget of the line: POINTS_PER_PIXEL per horizontal pixel of the axes."""
+        return max(int(self.ax.get_window_extent().width * POINTS_PER_PIXEL), 100)
+
+    def refresh(self):
+        start, end = self.ax.get_xlim()
+        self.line.set_data(*level_of_detail(self.x, self.y, self.max_points(), start, end, self.method))
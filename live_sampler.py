@@ -0,0 +1,196 @@
+import argparse
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from report_io import normalize_table, time_of_day
+
+# Default place of the Linux power supply class
+SYSFS_ROOT = "/sys/class/power_supply"
+
+# Samples kept by default, one hour at the default interval
+DEFAULT_CAPACITY = 7200
+DEFAULT_INTERVAL = 0.5
+
+class BatterySource(ABC):
+    """Where live samples come from. read() returns (on_ac, capacity in mWh, percent), NaN when unknown."""
+
+    @abstractmethod
+    def read(self):
+        pass
+
+    def close(self):
+        pass
+
+class SysfsSource(BatterySource):
+    """Reads the batteries and mains adapters under /sys/class/power_supply.
+
+    The attribute files are opened once and re-read in place with pread, so a
+    sample costs a few small reads. root can point to a fake tree with the same
+    layout: <supply>/type, <supply>/online, <supply>/energy_now, ...
+    """
+
+    def __init__(self, root=SYSFS_ROOT):
+        self.batteries, self.adapters, self._files = [], [], []
+        for name in sorted(os.listdir(root)):
+            supply = os.path.join(root, name)
+            kind = self._read_text(os.path.join(supply, "type"))
+            if kind == "Battery":
+                self.batteries.append({attribute: self._open(supply, attribute) for attribute in
+                                       ["energy_now", "energy_full", "charge_now", "charge_full", "voltage_now", "capacity"]})
+            elif kind in ("Mains", "USB"):
+                self.adapters.append(self._open(supply, "online"))
+        if not self.batteries:
+            self.close()
+            raise FileNotFoundError(f"No battery found in {root}")
+
+    @staticmethod
+    def _read_text(path):
+        try:
+            with open(path) as file:
+                return file.read().strip()
+        except OSError:
+            return None
+
+    def _open(self, supply, attribute):
+        try:
+            fd = os.open(os.path.join(supply, attribute), os.O_RDONLY)
+        except OSError:
+            return None
+        self._files.append(fd)
+        return fd
+
+    @staticmethod
+    def _value(fd):
+        if fd is None:
+            return np.nan
+        try:
+            return float(os.pread(fd, 32, 0))
+        except (OSError, ValueError):
+            return np.nan
+
+    def _energy(self, battery, kind):
+        """Energy in mWh, from energy_* (uWh) or charge_* (uAh) times voltage_now (uV)."""
+        energy = self._value(battery[f"energy_{kind}"])
+        if np.isnan(energy):
+            energy = self._value(battery[f"charge_{kind}"]) * self._value(battery["voltage_now"]) / 1e6
+        return energy / 1000
+
+    def read(self):
+        on_ac = any(self._value(fd) == 1 for fd in self.adapters)
+        now = sum(self._energy(battery, "now") for battery in self.batteries)
+        full = sum(self._energy(battery, "full") for battery in self.batteries)
+        percent = now / full * 100 if full > 0 else self._value(self.batteries[0]["capacity"])
+        return on_ac, now, percent
+
+    def close(self):
+        for fd in self._files:
+            os.close(fd)
+        self._files = []
+
+class RingBuffer:
+    """Fixed-size, preallocated columns of samples; the oldest samples are overwritten when full."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.on_ac = np.empty(capacity, dtype=bool)
+        self.energy = np.empty(capacity, dtype=np.float64)
+        self.percent = np.empty(capacity, dtype=np.float64)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, on_ac, energy, percent):
+        with self._lock:
+            i = self.count % self.capacity
+            self.times[i], self.on_ac[i], self.energy[i], self.percent[i] = timestamp, on_ac, energy, percent
+            self.count += 1
+
+    def arrays(self):
+        """Copies of the stored columns in time order."""
+        with self._lock:
+            size = min(self.count, self.capacity)
+            order = (np.arange(size) + self.count - size) % self.capacity
+            return self.times[order], self.on_ac[order], self.energy[order], self.percent[order]
+
+    def to_recent_usage(self):
+        """The buffered samples as a table with the columns and types of a cleaned recent_usage.
+
+        TIME keeps the sub-second sample times, written tables truncate them to whole seconds.
+        """
+        times, on_ac, energy, percent = self.arrays()
+        # Local wall-clock time, like the times of a battery report
+        offset = datetime.now().astimezone().utcoffset().total_seconds()
+        start = pd.to_datetime(times + offset, unit="s").round("us")
+        return normalize_table(pd.DataFrame({
+            "DATE": start.normalize(),
+            "TIME": time_of_day(start).to_numpy(),
+            "STATE": "Active",
+            "SOURCE": np.where(on_ac, "AC", "Battery"),
+            "CAPACITY REMAINING PERCENT": pd.Series(np.round(percent)).map("{:.0f} %".format).where(~np.isnan(percent), "-"),
+            "CAPACITY REMAINING": np.round(energy),
+        }), "recent_usage")
+
+class LiveSampler:
+    """Samples a BatterySource every interval seconds on a background thread into a RingBuffer."""
+
+    def __init__(self, source, interval=DEFAULT_INTERVAL, capacity=DEFAULT_CAPACITY):
+        self.source = source
+        self.interval = interval
+        self.buffer = RingBuffer(capacity)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        # Deadlines are kept on a fixed grid, so slow reads do not make the interval drift
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            self.buffer.append(time.time(), *self.source.read())
+            deadline += self.interval
+            self._stop.wait(max(deadline - time.monotonic(), 0))
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.source.close()
+
+    def snapshot(self):
+        """The samples so far as a recent_usage table."""
+        return self.buffer.to_recent_usage()
+
+def main():
+    from report_io import write_table
+
+    parser = argparse.ArgumentParser(description="Sample the battery live into a recent_usage table.")
+    parser.add_argument("--root", default=SYSFS_ROOT, help="power supply directory, or a fake tree with the same layout")
+    parser.add_argument("-i", "--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between samples")
+    parser.add_argument("-d", "--duration", type=float, default=60, help="seconds to sample for")
+    parser.add_argument("-n", "--capacity", type=int, default=DEFAULT_CAPACITY, help="samples kept, older ones are dropped")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "live-report"),
+                        help="directory to write recent_usage to, readable by the charts and analytics")
+    args = parser.parse_args()
+
+    sampler = LiveSampler(SysfsSource(args.root), args.interval, args.capacity).start()
+    try:
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+
+    recent_usage = sampler.snapshot()
+    os.makedirs(args.output, exist_ok=True)
+    path = write_table(recent_usage, "recent_usage", args.output)
+    print(f"Sampled {len(recent_usage)} readings to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,64 @@
-# Install required packages before any imports or other code
-import subprocess
+import time
 
-try:
-    subprocess.check_call(["pip", "install", "-r", "requirement.txt"])
-    print("All packages installed successfully!")
-except subprocess.CalledProcessError as e:
-    print(f"Error occurred while installing packages: {e}")
-    exit(1)  # Exit the program if package installation fails
+# Measured from here, before any other import
+STARTUP_START = time.perf_counter()
+SESSION_START = time.time()
 
-import tkinter as tk
-from tkinter import ttk
-from PIL import Image, ImageTk
 import os
-import pandas as pd
+import re
+import subprocess
+from importlib import metadata
 
 # Get the directory path of the current script
 dir_path = os.path.dirname(os.path.abspath(__file__))
 
+# Seconds from launch to the first drawn window before a warning is printed
+STARTUP_BUDGET = float(os.environ.get("BATTERY_STARTUP_BUDGET", "1.5"))
+
+# Resized copies of background.jpg, one per screen resolution
+CACHE_DIR = os.path.join(dir_path, ".cache")
+
+def missing_requirements(requirements_path):
+    """Lists the requirements that have no installed distribution, without running pip."""
+    missing = []
+    with open(requirements_path) as requirements:
+        for line in requirements:
+            name = re.split(r"[\s<>=!~;\[#]", line.strip(), maxsplit=1)[0]
+            if not name:
+                continue
+            try:
+                metadata.version(name)
+            except metadata.PackageNotFoundError:
+                missing.append(name)
+    return missing
+
+# Install required packages only when some are missing
+requirements_path = os.path.join(dir_path, "requirement.txt")
+missing = missing_requirements(requirements_path)
+if missing:
+    print(f"Installing missing packages: {', '.join(missing)}")
+    try:
+        subprocess.check_call(["pip", "install", "-r", requirements_path])
+        print("All packages installed successfully!")
+    except subprocess.CalledProcessError as e:
+        print(f"Error occurred while installing packages: {e}")
+        exit(1)  # Exit the program if package installation fails
+
+# pandas, matplotlib and the chart modules are imported when first needed
+import tkinter as tk
+from tkinter import ttk
+from charts import CHARTS, PROFILE_NAME, load_plot
+import instrumentation
+
+# Tables of the last extraction, shared in memory by the dashboard
+report_tables = None
+
+# Sidebar views: button label -> report table
+CHART_VIEWS = {title: table_name for table_name, (title, _, _) in CHARTS.items()}
+
+# Chart pages (canvas and zoom toolbar) already drawn for report_tables, by view
+chart_pages = {}
+
 # Create the main window
 root = tk.Tk()
 root.title("Battery Usage Analysis Dashboard")
@@ -28,9 +70,20 @@ root.state("zoomed")  # For Windows systems, ensures the window is maximized
 screen_width = root.winfo_screenwidth()
 screen_height = root.winfo_screenheight()
 
+# Function to load the background resized to the screen, resizing it only once per resolution
+def load_background(width, height):
+    source_path = os.path.join(dir_path, "background.jpg")
+    cached_path = os.path.join(CACHE_DIR, f"background-{width}x{height}.png")
+    if not os.path.exists(cached_path) or os.path.getmtime(cached_path) < os.path.getmtime(source_path):
+        from PIL import Image
+
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        Image.open(source_path).convert("RGB").resize((width, height)).save(cached_path, compress_level=1)
+    # Tk reads PNG natively, so PIL is not imported once the cache exists
+    return tk.PhotoImage(file=cached_path)
+
 # Set background as a JPEG file (ensure 'background.jpg' is in the same directory)
-background_image = Image.open(os.path.join(dir_path, "background.jpg"))
-background_photo = ImageTk.PhotoImage(background_image.resize((screen_width, screen_height)))
+background_photo = load_background(screen_width, screen_height)
 canvas = tk.Canvas(root, width=screen_width, height=screen_height, highlightthickness=0)
 canvas.pack(fill="both", expand=True)
 canvas.create_image(0, 0, image=background_photo, anchor="nw")
@@ -45,22 +98,54 @@ title_label = tk.Label(
 )
 title_label.place(relx=0.5, rely=0.05, anchor="center")
 
-# Function to execute a Python file
-def execute_file(file_name):
-    file_path = os.path.join(dir_path, file_name)
-    try:
-        subprocess.check_call(["python", file_path])
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred while executing {file_path}: {e}")
-
-# Function to execute gone.py and exit the program
+# Frame in the middle of the analysis page that holds the embedded charts
+chart_frame = tk.Frame(root, bg="black")
+
+# Function to show a chart of the extracted tables inside the dashboard
+def show_chart(view):
+    """Shows a chart view, drawing it only the first time it is opened for the current report."""
+    if report_tables is None:
+        print("No report data available. Please ensure the extraction ran successfully.")
+        return
+
+    if view not in chart_pages:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        table_name = CHART_VIEWS[view]
+        with instrumentation.stage("render", chart=table_name) as stage:
+            plot = load_plot(table_name)
+            figure = Figure(figsize=(10, 6), layout="constrained")
+            plot(getattr(report_tables, table_name), figure.add_subplot())
+
+            # The toolbar zooms and pans, and the lines re-decimate for the new range
+            page = tk.Frame(chart_frame, bg="black")
+            chart_canvas = FigureCanvasTkAgg(figure, master=page)
+            NavigationToolbar2Tk(chart_canvas, page).pack(side="bottom", fill="x")
+            chart_canvas.get_tk_widget().pack(fill="both", expand=True)
+            chart_canvas.draw()
+            stage.rows = len(getattr(report_tables, table_name))
+        instrumentation.write(os.path.join(dir_path, "battery-report", PROFILE_NAME), append=True)
+        chart_pages[view] = page
+
+    # Switching views only swaps which cached page is packed
+    for page_view, page in chart_pages.items():
+        if page_view != view:
+            page.pack_forget()
+    chart_pages[view].pack(fill="both", expand=True)
+
+# Function to keep the outputs within their disk budget and exit the program.
+# The extracted report is kept so the next launch can reuse it, gone.py deletes it explicitly.
 def execute_exit():
-    gone_path = os.path.join(dir_path, "gone.py")
+    import retention
+
     try:
-        subprocess.check_call(["python", gone_path])
-        print("All files deleted successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred while executing {gone_path}: {e}")
+        # Outputs used in this session are kept, whatever their size
+        evicted = retention.enforce(keep_since=SESSION_START)
+        if evicted:
+            print(f"Evicted {len(evicted)} old output(s) to stay within the disk budget.")
+    except OSError as e:
+        print(f"Error occurred while evicting old outputs: {e}")
     finally:
         root.destroy()  # Close the window and exit the program
 
@@ -98,23 +183,14 @@ def open_analysis_page():
     description_label.place(relx=0.5, rely=0.15, anchor="center")
 
     # Display system information and battery details
-    try:
-        # Read and format system information
-        system_info_path = os.path.join(dir_path, "battery-report", "system_info.csv")
-        system_info_df = pd.read_csv(system_info_path)
-        system_info = "\n".join([f"{column.upper():<25}: {value}" for column, value in system_info_df.iloc[0].items()])
-
-        # Read and format battery details
-        battery_details_path = os.path.join(dir_path, "battery-report", "battery_details.csv")
-        battery_details_df = pd.read_csv(battery_details_path)
-        battery_details = "\n".join([f"{column.upper():<25}: {value}" for column, value in battery_details_df.iloc[0].items()])
+    if report_tables is not None:
+        system_info = format_info(report_tables.system_info)
+        battery_details = format_info(report_tables.battery_details)
 
         # Combine the formatted data
         formatted_data = f"SYSTEM INFORMATION\n{'-' * 20}\n{system_info}\n\nBATTERY DETAILS\n{'-' * 20}\n{battery_details}"
-    except FileNotFoundError:
-        formatted_data = "Error: Required CSV files not found. Please ensure extract.py ran successfully."
-    except Exception as e:
-        formatted_data = f"Error reading CSV files: {e}"
+    else:
+        formatted_data = "Error: No report data available. Please ensure the extraction ran successfully."
 
     # Display the formatted data higher
     data_label = tk.Label(
@@ -135,60 +211,88 @@ def open_analysis_page():
 
     # Add buttons to the sidebar
     button_style = {"font": ("Helvetica", 12), "bg": "gray", "fg": "white", "relief": "flat"}
-    button1 = tk.Button(sidebar, text="Battery Capacity History", **button_style, command=lambda: execute_file("battery_cap_hist.py"))
-    button1.pack(fill="x", pady=10, padx=10)
+    for view in CHART_VIEWS:
+        button = tk.Button(sidebar, text=view, **button_style, command=lambda view=view: show_chart(view))
+        button.pack(fill="x", pady=10, padx=10)
 
-    button2 = tk.Button(sidebar, text="Battery Life Estimates", **button_style, command=lambda: execute_file("battery_life_estimate.py"))
-    button2.pack(fill="x", pady=10, padx=10)
-
-    button3 = tk.Button(sidebar, text="Battery Usage", **button_style, command=lambda: execute_file("battery_usage.py"))
-    button3.pack(fill="x", pady=10, padx=10)
-
-    button4 = tk.Button(sidebar, text="Recent Usage", **button_style, command=lambda: execute_file("recent_usage.py"))
-    button4.pack(fill="x", pady=10, padx=10)
-
-    button5 = tk.Button(sidebar, text="Usage History", **button_style, command=lambda: execute_file("usage_history.py"))
-    button5.pack(fill="x", pady=10, padx=10)
+    # Charts are drawn between the description and the report details
+    chart_frame.place(relx=0.55, rely=0.48, relwidth=0.65, relheight=0.45, anchor="center")
+    chart_frame.lift()
 
     # Add an "Exit" button to the bottom-right corner
     exit_button = tk.Button(root, text="Exit", **button_style, command=execute_exit)
     exit_button.place(relx=1, rely=1, anchor="se")
 
-# Function to print CSV contents
-def print_csv_contents(file_name, title):
-    """Reads a CSV file and prints its contents in an elegant format."""
-    file_path = os.path.join(dir_path, "battery-report", file_name)
+# Function to format an info dict as aligned "LABEL: value" lines
+def format_info(info):
+    return "\n".join([f"{column.upper():<25}: {value}" for column, value in info.items()])
+
+# Function to print info dict contents
+def print_info(info, title):
+    """Prints an info dict of the extracted report in an elegant format."""
     print(f"\n{title}\n" + "-" * len(title))
-    try:
-        df = pd.read_csv(file_path)
-        for column, value in df.iloc[0].items():
-            print(f"{column.upper():<25}: {value}")
-    except FileNotFoundError:
-        print(f"Error: {file_path} not found.")
-    except Exception as e:
-        print(f"Error reading {file_path}: {e}")
+    print(format_info(info))
 
-# Add a "Start" button
-def start_button_action():
-    try:
-        # Hide the "Start" button
-        start_button.place_forget()
+# Overall seconds an extraction may run before it is cancelled
+EXTRACTION_TIMEOUT = float(os.environ.get("BATTERY_EXTRACTION_TIMEOUT", "300"))
+
+# Milliseconds between checks of the background extraction
+POLL_INTERVAL = 100
+
+# Progress of the running extraction, shown where the "Start" button was
+progress_label = tk.Label(root, font=("Helvetica", 16), bg="black", fg="gold")
+cancel_button = tk.Button(root, text="Cancel", font=("Helvetica", 12), bg="gray", fg="white", relief="flat")
+
+# Function to apply the events of the background extraction on the Tk thread
+def poll_extraction(job):
+    global report_tables
+    for kind, value in job.poll():
+        if kind == "stage":
+            progress_label.config(text=f"{value.capitalize()}...")
+            continue
 
-        # Execute the extract.py file
-        execute_file("extract.py")
-        print("extract.py executed successfully!")
+        if kind == "done":
+            report_tables = value
 
-        # Print system info
-        print_csv_contents("system_info.csv", "SYSTEM INFORMATION")
+            # Charts drawn for a previous report are stale now
+            for page in chart_pages.values():
+                page.destroy()
+            chart_pages.clear()
+            print("Extraction completed successfully!")
 
-        # Print battery details
-        print_csv_contents("battery_details.csv", "BATTERY DETAILS")
+            # Print system info
+            print_info(report_tables.system_info, "SYSTEM INFORMATION")
+
+            # Print battery details
+            print_info(report_tables.battery_details, "BATTERY DETAILS")
+        elif kind == "cancelled":
+            print(f"Extraction cancelled: {value}")
+        else:
+            print(f"Error occurred: {value}")
+
+        progress_label.place_forget()
+        cancel_button.place_forget()
 
         # Open the analysis page
         open_analysis_page()
+        return
 
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
+    root.after(POLL_INTERVAL, poll_extraction, job)
+
+# Add a "Start" button
+def start_button_action():
+    # Hide the "Start" button
+    start_button.place_forget()
+
+    # Generate and extract the report on a worker thread so the window stays responsive
+    from extraction_job import ExtractionJob
+
+    job = ExtractionJob(timeout=EXTRACTION_TIMEOUT).start()
+    progress_label.config(text="Starting...")
+    progress_label.place(relx=0.5, rely=0.5, anchor="center")
+    cancel_button.config(command=job.cancel)
+    cancel_button.place(relx=0.5, rely=0.57, anchor="center")
+    root.after(POLL_INTERVAL, poll_extraction, job)
 
 start_button = tk.Button(
     root,
@@ -206,5 +310,14 @@ root.iconbitmap(os.path.join(dir_path, "icon.ico"))
 # Keep a reference to the background image to prevent garbage collection
 canvas.image = background_photo
 
+# Function to report the time from launch to the first drawn window
+def report_startup_time():
+    elapsed = time.perf_counter() - STARTUP_START
+    print(f"Dashboard ready in {elapsed:.2f}s (budget {STARTUP_BUDGET:g}s)")
+    if elapsed > STARTUP_BUDGET:
+        print("Warning: startup exceeded its time budget.")
+
+root.after_idle(report_startup_time)
+
 # Run the application
 root.mainloop()
@@ -0,0 +1,294 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import rollups
+from report_io import OUTPUT_FORMATS, TABLE_SCHEMAS, format_time_of_day, read_table, start_times
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Query results kept in memory, the least recently used is dropped first
+CACHE_SIZE = 256
+
+# Column each table is filtered and grouped on, the first one present is used.
+# Tables with both DATE and TIME (recent_usage, battery_usage) use their start times instead.
+DATE_COLUMNS = ["DATE", "PERIOD_START", "START_TIME"]
+
+# group= values and the pandas period they stand for
+GROUPS = {"hour": "h", "day": "D", "week": "W", "month": "M", "year": "Y"}
+AGGREGATES = ("sum", "mean", "min", "max", "count")
+
+class QueryError(Exception):
+    """A request the API cannot answer, with the HTTP status to reply with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class TableCache:
+    """Tables and query results of one report directory and history store, dropped whenever their files change.
+
+    The version is the name, size and modification time of every table file and
+    of the history store, so a new extraction (by this process or any other)
+    invalidates everything at once.
+    """
+
+    def __init__(self, report_dir, history_path=None, size=CACHE_SIZE):
+        self.report_dir = report_dir
+        self.history_path = history_path
+        self.size = size
+        self.version = None
+        self.tables = {}
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        # One lock per table, so concurrent requests load a table once without blocking other tables
+        self.load_locks = {name: threading.Lock() for name in TABLE_SCHEMAS}
+
+    def current_version(self):
+        signature = []
+        for name in TABLE_SCHEMAS:
+            for extension in OUTPUT_FORMATS.values():
+                try:
+                    stat = os.stat(os.path.join(self.report_dir, name + extension))
+                except OSError:
+                    continue
+                signature.append((name + extension, stat.st_size, stat.st_mtime_ns))
+        if self.history_path and os.path.exists(self.history_path):
+            stat = os.stat(self.history_path)
+            signature.append((self.history_path, stat.st_size, stat.st_mtime_ns))
+        return hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+
+    def refresh(self):
+        """Returns the current version, clearing the caches when the files changed."""
+        version = self.current_version()
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.tables = {}
+                self.results.clear()
+        return version
+
+    def table(self, name):
+        if name not in TABLE_SCHEMAS:
+            raise QueryError(404, f"Unknown table {name}")
+        with self.load_locks[name]:
+            df = self.tables.get(name)
+            if df is None:
+                try:
+                    df = read_table(name, self.report_dir)
+                except FileNotFoundError:
+                    raise QueryError(404, f"Table {name} has not been extracted")
+                self.tables[name] = df
+        return df
+
+    def rollup(self, name, start=None, end=None, device=None):
+        if name not in rollups.ROLLUPS:
+            raise QueryError(404, f"Unknown rollup {name}")
+        if not self.history_path or not os.path.exists(self.history_path):
+            raise QueryError(404, "No history store has been written yet")
+        # A connection per query, SQLite connections are not shared across threads
+        conn = sqlite3.connect(self.history_path)
+        try:
+            return rollups.query_rollup(conn, name, start, end, device)
+        finally:
+            conn.close()
+
+    def result(self, key, compute):
+        """Returns the cached (body, etag) of key, computing and caching it if missing."""
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key]
+        body = compute()
+        entry = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+        with self.lock:
+            self.results[key] = entry
+            while len(self.results) > self.size:
+                self.results.popitem(last=False)
+        return entry
+
+def _time_axis(df):
+    """The datetimes a table is filtered and grouped on, None if it has no date column."""
+    if "DATE" in df.columns and "TIME" in df.columns:
+        return start_times(df)
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            return pd.to_datetime(df[column])
+    return None
+
+def _timestamp(params, name):
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        timestamp = pd.Timestamp(value)
+    except ValueError:
+        raise QueryError(400, f"{name} must be a date or date and time, e.g. 2024-01-31 or 2024-01-31T08:00, got {value}")
+    if timestamp.tzinfo is not None:
+        # Report times are local wall-clock times without an offset
+        timestamp = pd.Timestamp(datetime.fromtimestamp(timestamp.timestamp()))
+    return timestamp
+
+def query_table(df, start=None, end=None, group=None, aggregate="sum", by=None, columns=None):
+    """Filters a table to [start, end) on its time axis and optionally aggregates it.
+
+    The time axis is the start time (DATE and TIME) of usage rows, otherwise the
+    date column. group buckets rows by hour, day, week, month or year of it, by
+    adds table columns to group on, and aggregate is applied to every numeric
+    column. columns limits the result to the listed columns.
+    """
+    dates = _time_axis(df)
+    if (start is not None or end is not None or group) and dates is None:
+        raise QueryError(400, "This table has no date column to filter or group on")
+    if dates is not None:
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= dates >= start
+        if end is not None:
+            mask &= dates < end
+        df, dates = df[mask], dates[mask]
+
+    unknown = [column for column in (by or []) + (columns or []) if column not in df.columns]
+    if unknown:
+        raise QueryError(400, f"Unknown column(s): {', '.join(unknown)}")
+
+    if group or by:
+        if group and group not in GROUPS:
+            raise QueryError(400, f"group must be one of {', '.join(GROUPS)}")
+        if aggregate not in AGGREGATES:
+            raise QueryError(400, f"aggregate must be one of {', '.join(AGGREGATES)}")
+        keys = [df[column] for column in by or []]
+        if group:
+            keys.insert(0, dates.dt.to_period(GROUPS[group]).dt.start_time.rename(group.upper()))
+        values = df.select_dtypes("number", exclude="timedelta").drop(columns=by or [], errors="ignore")
+        df = values.groupby(keys, sort=True).agg(aggregate).reset_index()
+
+    if columns:
+        df = df[[column for column in df.columns if column in columns or column in (by or [])]]
+    return df
+
+def to_json(df):
+    """Serializes a table as {"columns": [...], "data": [[...], ...]} with ISO dates."""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_timedelta64_dtype(df[column]):
+            # TIME is a time of day, sent as 'HH:MM:SS' like in the CSV files
+            df[column] = format_time_of_day(df[column])
+        elif df[column].dtype == object:
+            df[column] = df[column].map(lambda value: value.isoformat() if hasattr(value, "isoformat") else value)
+    return df.to_json(orient="split", index=False, date_format="iso", date_unit="s").encode()
+
+def _list(params, name):
+    value = params.get(name)
+    return [item for item in value.split(",") if item] if value else None
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /tables lists the tables, GET /tables/<name>?start=&end=&group=&aggregate=&by=&columns= queries one.
+
+    GET /rollups/<name>?start=&end=&device= reads the hourly, daily or weekly
+    rollups of the history store, a few rows per bucket instead of the raw rows.
+    """
+
+    cache = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            version = self.cache.refresh()
+            if parts == ["tables"]:
+                key = (version, "tables")
+                body, etag = self.cache.result(key, lambda: json.dumps(
+                    {"version": version, "tables": self._available(), "rollups": list(rollups.ROLLUPS)}).encode())
+            elif len(parts) == 2 and parts[0] == "tables":
+                name = parts[1]
+                options = dict(
+                    start=_timestamp(params, "start"),
+                    end=_timestamp(params, "end"),
+                    group=params.get("group"),
+                    aggregate=params.get("aggregate", "sum"),
+                    by=_list(params, "by"),
+                    columns=_list(params, "columns"),
+                )
+                key = (version, name, tuple(sorted(params.items())))
+                body, etag = self.cache.result(
+                    key, lambda: to_json(query_table(self.cache.table(name), **options)))
+            elif len(parts) == 2 and parts[0] == "rollups":
+                name = parts[1]
+                start, end = _timestamp(params, "start"), _timestamp(params, "end")
+                key = (version, "rollups", name, tuple(sorted(params.items())))
+                body, etag = self.cache.result(
+                    key, lambda: to_json(self.cache.rollup(name, start, end, params.get("device"))))
+            else:
+                raise QueryError(404, f"No such endpoint {url.path}")
+        except QueryError as e:
+            self._send(e.status, json.dumps({"error": str(e)}).encode())
+            return
+        except Exception as e:
+            # Any other failure still gets a reply instead of a dropped connection
+            self._send(500, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode())
+            return
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self._send(304, b"", etag)
+        else:
+            self._send(200, body, etag)
+
+    def _available(self):
+        return [name for name in TABLE_SCHEMAS
+                if any(os.path.exists(os.path.join(self.cache.report_dir, name + extension))
+                       for extension in OUTPUT_FORMATS.values())]
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(report_dir, host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=CACHE_SIZE, history_path=None):
+    """Returns a threaded HTTP server answering queries on the tables in report_dir; port 0 picks a free one."""
+    handler = type("ReportQueryHandler", (QueryHandler,), {"cache": TableCache(report_dir, history_path, cache_size)})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    from extract import HISTORY_PATH, report_dir
+
+    parser = argparse.ArgumentParser(description="Serve the extracted battery report tables as JSON on localhost.")
+    parser.add_argument("--report-dir", default=report_dir, help="directory of extracted tables")
+    parser.add_argument("--history", default=HISTORY_PATH, help="history store holding the rollups")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="query results kept in memory")
+    args = parser.parse_args()
+
+    server = make_server(args.report_dir, args.host, args.port, args.cache_size, args.history)
+    print(f"Serving {args.report_dir} on http://{server.server_address[0]}:{server.server_address[1]}/tables")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
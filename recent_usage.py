@@ -1,23 +1,37 @@
 import os
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import instrumentation
+from charts import PROFILE_NAME
+from report_io import read_table, start_times
+from level_of_detail import LevelOfDetailLine
 
-# Get the directory path
-dir_path = os.path.dirname(os.path.abspath(__file__))
+def plot_recent_usage(recent_usage, ax):
+    """Draws the capacity remaining over time on ax, decimated to the visible range."""
+    LevelOfDetailLine(ax, start_times(recent_usage), recent_usage['CAPACITY REMAINING'])
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Capacity Remaining')
+    ax.set_title('Recent Usage')
+    ax.tick_params(axis='x', labelrotation=45)
 
-# Load dataset
-recent_usage = pd.read_csv(os.path.join(dir_path, 'battery-report', 'recent_usage.csv'))
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
 
-# Display the first few rows
-print("Recent Usage:")
-print(recent_usage.head())
+    # Get the directory path
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+    report_dir = os.path.join(dir_path, 'battery-report')
 
-# Visualization
-plt.figure(figsize=(10, 6))
-sns.lineplot(x='DATE', y='CAPACITY REMAINING', data=recent_usage)
-plt.xlabel('Date')
-plt.ylabel('Capacity Remaining')
-plt.title('Recent Usage')
-plt.xticks(rotation=45)
-plt.show()
\ No newline at end of file
+    # Load dataset
+    with instrumentation.stage('load', table='recent_usage') as stage:
+        recent_usage = read_table('recent_usage', report_dir)
+        stage.rows = len(recent_usage)
+
+    # Display the first few rows
+    print("Recent Usage:")
+    print(recent_usage.head())
+
+    # Visualization
+    fig, ax = plt.subplots(figsize=(10, 6))
+    with instrumentation.stage('render', chart='recent_usage'):
+        plot_recent_usage(recent_usage, ax)
+        fig.canvas.draw()
+    instrumentation.write(os.path.join(report_dir, PROFILE_NAME), append=True)
+    plt.show()
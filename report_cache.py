@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+from report_io import OUTPUT_FORMATS
+
+# Fingerprints of the last extraction, kept next to the tables it wrote
+MANIFEST_NAME = "report-cache.json"
+
+# Bumped whenever parsing or cleaning changes, so outputs of older code are never reused
+CACHE_VERSION = 2
+
+SECTION_START = re.compile(rb"<h2[\s>]", re.IGNORECASE)
+SECTION_TITLE = re.compile(rb"<h2[^>]*>(.*?)</h2>", re.IGNORECASE | re.DOTALL)
+TAG = re.compile(rb"<[^>]*>")
+
+# Key of everything in an HTML report that is not one of the tables
+INFO = "info"
+
+def fingerprint(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def frame_fingerprint(df):
+    """Fingerprint of a raw table's columns and cells."""
+    digest = hashlib.blake2b(repr(list(df.columns)).encode(), digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def html_sections(data, section_headers):
+    """Splits raw HTML report bytes at every h2 into [(key, bytes)] in document order.
+
+    A section belongs to the table whose header its h2 contains, like
+    ReportIndex.find_table matches them; everything else is keyed INFO. Joined
+    back in order, the parts are the whole document.
+    """
+    starts = [0, *(match.start() for match in SECTION_START.finditer(data)), len(data)]
+    parts = []
+    for start, end in zip(starts, starts[1:]):
+        if start == end:
+            continue
+        key = INFO
+        title = SECTION_TITLE.match(data, start)
+        if title:
+            text = TAG.sub(b"", title.group(1)).decode("utf-8", "replace").strip().lower()
+            key = next((name for name, header in section_headers.items()
+                        if name not in dict(parts) and header.lower() in text), INFO)
+        parts.append((key, data[start:end]))
+    return parts
+
+def load_manifest(report_dir):
+    path = os.path.join(report_dir, MANIFEST_NAME)
+    try:
+        with open(path) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == CACHE_VERSION else {}
+
+def save_manifest(report_dir, manifest):
+    with open(os.path.join(report_dir, MANIFEST_NAME), "w") as file:
+        json.dump({**manifest, "version": CACHE_VERSION}, file, indent=2)
+
+def clear_manifest(report_dir):
+    """Forgets the last extraction, done before its outputs are overwritten."""
+    try:
+        os.remove(os.path.join(report_dir, MANIFEST_NAME))
+    except FileNotFoundError:
+        pass
+
+def reusable(manifest, key, section_fingerprint, report_dir, output_format, names):
+    """True when the section is unchanged since the last run and its output tables are still there."""
+    return (
+        manifest.get("format") == output_format
+        and manifest.get("sections", {}).get(key) == section_fingerprint
+        and all(os.path.exists(os.path.join(report_dir, name + OUTPUT_FORMATS[output_format])) for name in names)
+    )
@@ -0,0 +1,243 @@
+import os
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+# Column types of every table written to battery-report/. They are applied
+# on write and on read, so no reader has to infer types from CSV text.
+TABLE_SCHEMAS = {
+    "system_info": {
+        "Computer Name": "string",
+        "System Product Name": "string",
+        "OS Build": "string",
+        "BIOS": "string",
+        "Report Time": "string",
+    },
+    "battery_details": {
+        "Battery Name": "string",
+        "Manufacturer": "string",
+        "Chemistry": "string",
+        "Design Capacity": "string",
+        "Full Charge Capacity": "string",
+    },
+    "recent_usage": {
+        "DATE": "date",
+        "TIME": "time",
+        "STATE": "string",
+        "SOURCE": "string",
+        "CAPACITY REMAINING PERCENT": "string",
+        "CAPACITY REMAINING": "float",
+    },
+    "battery_usage": {
+        "DATE": "date",
+        "TIME": "time",
+        "STATE": "string",
+        "DURATION": "int",
+        "ENERGY DRAINED PERCENT": "string",
+        "ENERGY DRAINED": "float",
+    },
+    "usage_history": {
+        "PERIOD": "string",
+        "PERIOD_START": "date",
+        "PERIOD_END": "date",
+        "BATTERY DURATION ACTIVE": "int",
+        "BATTERY DURATION CONNECTED STANDBY": "int",
+        "AC DURATION ACTIVE": "int",
+        "AC DURATION CONNECTED STANDBY": "int",
+    },
+    "battery_capacity_history": {
+        "PERIOD": "string",
+        "PERIOD_START": "date",
+        "PERIOD_END": "date",
+        "FULL CHARGE CAPACITY": "float",
+        "DESIGN CAPACITY": "float",
+    },
+    "battery_life_estimates": {
+        "PERIOD": "string",
+        "PERIOD_START": "date",
+        "PERIOD_END": "date",
+        "AT FULL CHARGE ACTIVE": "int",
+        "CONNECTED_STANDBY_TIME": "int",
+        "CONNECTED_STANDBY_PERCENT": "string",
+        "AT DESIGN CAPACITY ACTIVE": "int",
+        "DESIGN_CONNECTED_STANDBY_TIME": "int",
+        "DESIGN_CONNECTED_STANDBY_PERCENT": "string",
+    },
+    # Derived by session_analytics from the tables above
+    "discharge_sessions": {
+        "SESSION": "int",
+        "KIND": "string",
+        "STATE": "string",
+        "START_TIME": "datetime",
+        "END_TIME": "datetime",
+        "DURATION": "int",
+        "ENTRIES": "int",
+        "START CAPACITY": "float",
+        "END CAPACITY": "float",
+        "ENERGY": "float",
+        "DRAIN RATE": "float",
+        "DEPTH OF DISCHARGE": "float",
+    },
+    "daily_energy": {
+        "DATE": "date",
+        "ENERGY DRAINED": "float",
+        "DURATION": "int",
+        "DRAINS": "int",
+        "AVERAGE DRAIN RATE": "float",
+    },
+}
+
+# Output formats understood by write_table, "arrow" is the Arrow IPC (Feather v2) file format
+OUTPUT_FORMATS = {"csv": ".csv", "arrow": ".arrow"}
+
+CSV_DTYPES = {"string": "string", "float": "float64", "int": "Int64"}
+
+# Times of day (TIME) are timedelta64 since midnight in memory and 'HH:MM:SS' on disk.
+# The text of every second of a day is built once, so formatting is an array lookup.
+_TIME_TEXT = np.array([f"{second // 3600:02}:{second // 60 % 60:02}:{second % 60:02}" for second in range(86400)],
+                      dtype=object)
+
+def time_of_day(values):
+    """Converts times of day (timedeltas, datetimes, 'HH:MM:SS' text or datetime.time objects) to timedelta64."""
+    values = pd.Series(values)
+    if pd.api.types.is_timedelta64_dtype(values):
+        return values.astype("timedelta64[us]")
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return (values - values.dt.normalize()).astype("timedelta64[us]")
+    # A day has at most 86400 distinct times, each is converted once
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    text = uniques.map(lambda value: value.strftime("%H:%M:%S") if isinstance(value, time) else value)
+    parsed = pd.to_datetime(text, format="%H:%M:%S", errors="coerce")
+    offsets = np.append((parsed - parsed.dt.normalize()).to_numpy(dtype="timedelta64[us]"), np.timedelta64("NaT", "us"))
+    return pd.Series(offsets[codes], index=values.index)
+
+def format_time_of_day(values):
+    """'HH:MM:SS' text of a timedelta64 time of day column, None where missing."""
+    seconds = (values / pd.Timedelta(seconds=1)).to_numpy(dtype=float, na_value=np.nan)
+    known = ~np.isnan(seconds)
+    text = np.full(len(seconds), None, dtype=object)
+    text[known] = _TIME_TEXT[seconds[known].astype(np.int64) % 86400]
+    return pd.Series(text, index=values.index)
+
+def _time_columns(name, df):
+    return [column for column in df.columns
+            if TABLE_SCHEMAS.get(name, {}).get(column) == "time" and pd.api.types.is_timedelta64_dtype(df[column])]
+
+def _arrow_schema(name, df):
+    import pyarrow as pa
+
+    arrow_types = {
+        "string": pa.string(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "date": pa.date32(),
+        # Written as whole seconds and cast to time32 once in Arrow
+        "time": pa.int32(),
+        "datetime": pa.timestamp("s"),
+    }
+    schema = TABLE_SCHEMAS[name]
+    return pa.schema([(column, arrow_types[schema.get(column, "string")]) for column in df.columns])
+
+def write_table(df, name, report_dir, output_format="csv"):
+    """Writes a report table in the requested format and removes stale copies in other formats."""
+    if output_format == "arrow":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            print("pyarrow is not installed, writing CSV instead.")
+            output_format = "csv"
+
+    path = os.path.join(report_dir, name + OUTPUT_FORMATS[output_format])
+    if output_format == "arrow":
+        # Empty strings are nulls once written to CSV, keep both formats alike
+        strings = [column for column in df.columns if TABLE_SCHEMAS[name].get(column, "string") == "string"]
+        df = df.assign(**{column: df[column].mask(df[column].eq("")) for column in strings})
+        times = _time_columns(name, df)
+        df = df.assign(**{column: (df[column] // pd.Timedelta(seconds=1)).astype("Int32") for column in times})
+        table = pa.Table.from_pandas(df, schema=_arrow_schema(name, df), preserve_index=False)
+        for column in times:
+            index = table.schema.get_field_index(column)
+            table = table.set_column(index, column, table.column(index).cast(pa.time32("s")))
+        # Uncompressed so readers can memory-map the columns without copying
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        df = df.assign(**{column: format_time_of_day(df[column]) for column in _time_columns(name, df)})
+        df.to_csv(path, index=False)
+
+    for other_format, extension in OUTPUT_FORMATS.items():
+        other_path = os.path.join(report_dir, name + extension)
+        if other_format != output_format and os.path.exists(other_path):
+            os.remove(other_path)
+    return path
+
+def _read_arrow(path, name):
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    # time32 would come back as datetime.time objects, seconds convert without them
+    times = [field.name for field in table.schema if pa.types.is_time(field.type)]
+    for column in times:
+        index = table.schema.get_field_index(column)
+        table = table.set_column(index, column, table.column(index).cast(pa.int32()))
+    # Strings and integers get the nullable dtypes a CSV read gives them
+    types = {pa.string(): pd.StringDtype(), pa.int64(): pd.Int64Dtype()}
+    df = table.to_pandas(date_as_object=False, types_mapper=types.get)
+    # Arrow keeps the stored unit (ms for dates, s for timestamps), CSV reads parse to us
+    for column, kind in TABLE_SCHEMAS.get(name, {}).items():
+        if kind in ("date", "datetime") and column in df.columns:
+            df[column] = df[column].astype("datetime64[us]")
+    for column in times:
+        df[column] = pd.to_timedelta(df[column].astype(float), unit="s").astype("timedelta64[us]")
+    return df
+
+def start_times(df):
+    """Combines the DATE and TIME columns of a usage table into one datetime64 column."""
+    return pd.to_datetime(df["DATE"]) + time_of_day(df["TIME"])
+
+def apply_schema(df, name):
+    """Casts a table read back from text (CSV, SQLite) to its declared column types."""
+    for column, kind in TABLE_SCHEMAS.get(name, {}).items():
+        if column not in df.columns:
+            continue
+        if kind in CSV_DTYPES:
+            df[column] = df[column].astype(CSV_DTYPES[kind])
+        elif kind == "date":
+            df[column] = pd.to_datetime(df[column], format="%Y-%m-%d", errors="coerce")
+        elif kind == "time":
+            df[column] = time_of_day(df[column])
+        elif kind == "datetime":
+            df[column] = pd.to_datetime(df[column], format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    return df
+
+def normalize_table(df, name):
+    """Gives a table just built in memory the column types and missing values read_table returns for it."""
+    strings = [column for column, kind in TABLE_SCHEMAS.get(name, {}).items()
+               if kind == "string" and column in df.columns]
+    # Empty strings are read back as missing, like in write_table
+    df = apply_schema(df.assign(**{column: df[column].mask(df[column].eq("")) for column in strings}), name)
+    for column, kind in TABLE_SCHEMAS.get(name, {}).items():
+        if kind in ("date", "datetime") and column in df.columns:
+            df[column] = df[column].astype("datetime64[us]")
+    return df
+
+def _read_csv(path, name, keep_default_na=True):
+    schema = TABLE_SCHEMAS.get(name, {})
+    dtypes = {column: CSV_DTYPES[kind] for column, kind in schema.items() if kind in CSV_DTYPES}
+    return apply_schema(pd.read_csv(path, dtype=dtypes, keep_default_na=keep_default_na), name)
+
+def read_table(name, report_dir, keep_default_na=True):
+    """Loads a report table, memory-mapping the Arrow file when present, else the CSV.
+
+    keep_default_na=False keeps CSV text such as 'N/A' or 'NA' as it is instead of reading it as missing.
+    """
+    arrow_path = os.path.join(report_dir, name + OUTPUT_FORMATS["arrow"])
+    if os.path.exists(arrow_path):
+        try:
+            return _read_arrow(arrow_path, name)
+        except ImportError:
+            pass
+
+    return _read_csv(os.path.join(report_dir, name + OUTPUT_FORMATS["csv"]), name, keep_default_na)
@@ -0,0 +1,136 @@
+import argparse
+import os
+import shutil
+import time
+
+dir_path = os.path.dirname(os.path.abspath(__file__))
+
+# Disk budget of the outputs below: total size and the age after which an entry is dropped
+MAX_BYTES = int(float(os.environ.get("BATTERY_OUTPUT_MAX_MB", "512")) * 1024 * 1024)
+MAX_AGE_DAYS = float(os.environ.get("BATTERY_OUTPUT_MAX_AGE_DAYS", "30"))
+
+# Managed output directories. True evicts each file or subdirectory on its own
+# (a report's charts, a cached image), False evicts the directory as a whole,
+# since its tables and cache manifest are only useful together.
+# battery-history.sqlite is long-term data and is never managed.
+MANAGED_DIRS = {
+    os.path.join(dir_path, "battery-report"): False,
+    os.path.join(dir_path, "fleet-report"): False,
+    os.path.join(dir_path, "live-report"): False,
+    os.path.join(dir_path, "charts"): True,
+    os.path.join(dir_path, ".cache"): True,
+}
+
+# Help of the output options of the batch tools, whose default directory is managed
+OUTPUT_HELP_NOTE = "only the default one is kept within the disk budget"
+
+def _usage(path):
+    """Size in bytes and last use (latest access or modification time) of a file or directory tree."""
+    stat = os.stat(path)
+    if not os.path.isdir(path):
+        return stat.st_size, max(stat.st_atime, stat.st_mtime)
+    size, last_used = 0, stat.st_mtime
+    for folder, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(folder, name))
+            except OSError:
+                continue
+            size += stat.st_size
+            last_used = max(last_used, stat.st_atime, stat.st_mtime)
+    return size, last_used
+
+def list_entries(dirs=None):
+    """Returns (path, size, last used) of every evictable entry of the managed directories, least recently used first."""
+    entries = []
+    for directory, per_child in (MANAGED_DIRS if dirs is None else dirs).items():
+        if not os.path.isdir(directory):
+            continue
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)] if per_child else [directory]
+        for path in paths:
+            try:
+                entries.append((path, *_usage(path)))
+            except OSError:
+                continue
+    return sorted(entries, key=lambda entry: entry[2])
+
+def plan_eviction(entries, max_bytes=MAX_BYTES, max_age_days=MAX_AGE_DAYS, keep_since=None, now=None):
+    """Picks the entries to drop: all older than max_age_days, then the least recently used until the rest fit max_bytes.
+
+    Entries used at or after keep_since (e.g. by the run that is enforcing the budget) are never picked.
+    """
+    now = time.time() if now is None else now
+    oldest_allowed = now - max_age_days * 86400
+    total = sum(size for _, size, _ in entries)
+    evicted = []
+    for path, size, last_used in entries:
+        if keep_since is not None and last_used >= keep_since:
+            continue
+        if last_used < oldest_allowed or total > max_bytes:
+            evicted.append((path, size, last_used))
+            total -= size
+    return evicted
+
+def remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def enforce(dirs=None, max_bytes=MAX_BYTES, max_age_days=MAX_AGE_DAYS, keep_since=None, dry_run=False):
+    """Evicts managed outputs over the age and size budget, returning the (path, size, last used) dropped."""
+    evicted = plan_eviction(list_entries(dirs), max_bytes, max_age_days, keep_since)
+    if not dry_run:
+        for path, _, _ in evicted:
+            remove(path)
+    return evicted
+
+def enforce_after_run(started):
+    """Enforces the budget on the default managed directories at the end of a batch run, keeping its own outputs.
+
+    Directories chosen by the user (e.g. with -o) are never managed, unrelated files may live there.
+    """
+    evicted = enforce(keep_since=started)
+    if evicted:
+        print(f"Evicted {len(evicted)} old output(s) to stay within the disk budget")
+    return evicted
+
+def purge(dirs=None):
+    """Deletes every managed output, returning the number of bytes freed."""
+    entries = list_entries(dirs)
+    for path, _, _ in entries:
+        remove(path)
+    return sum(size for _, size, _ in entries)
+
+def _describe(entries):
+    now = time.time()
+    for path, size, last_used in entries:
+        print(f"{size / 1024 / 1024:10.2f} MB  {(now - last_used) / 86400:7.1f} days  {os.path.relpath(path, dir_path)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep the report, chart and cache outputs within a disk budget.")
+    parser.add_argument("command", nargs="?", choices=["status", "enforce", "purge"], default="status",
+                        help="list the managed outputs, evict those over budget, or delete them all")
+    parser.add_argument("--max-mb", type=float, default=MAX_BYTES / 1024 / 1024, help="total size budget")
+    parser.add_argument("--max-age-days", type=float, default=MAX_AGE_DAYS, help="age after which outputs are evicted")
+    parser.add_argument("-d", "--dir", action="append", default=None,
+                        help="manage this directory instead of the default ones, evicting its entries one by one")
+    parser.add_argument("--dry-run", action="store_true", help="only print what enforce would evict")
+    args = parser.parse_args()
+
+    dirs = {os.path.abspath(directory): True for directory in args.dir} if args.dir else None
+    if args.command == "status":
+        entries = list_entries(dirs)
+        _describe(entries)
+        print(f"{sum(size for _, size, _ in entries) / 1024 / 1024:.2f} MB in {len(entries)} entries")
+    elif args.command == "enforce":
+        evicted = enforce(dirs, int(args.max_mb * 1024 * 1024), args.max_age_days, dry_run=args.dry_run)
+        _describe(evicted)
+        print(f"{'Would evict' if args.dry_run else 'Evicted'} {len(evicted)} entries, "
+              f"{sum(size for _, size, _ in evicted) / 1024 / 1024:.2f} MB")
+    else:
+        freed = purge(dirs)
+        print(f"All outputs deleted, {freed / 1024 / 1024:.2f} MB freed.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import pandas as pd
+import history_store
+from report_io import start_times
+
+# SQLite expressions turning a stored time (ISO text) into the start of its bucket
+# as 'YYYY-MM-DD HH:MM:SS', weeks start on Monday
+GRAINS = {
+    "hourly": ("strftime('%Y-%m-%d %H:00:00', {key})", pd.Timedelta(hours=1)),
+    "daily": ("datetime({key}, 'start of day')", pd.Timedelta(days=1)),
+    "weekly": ("datetime({key}, 'start of day', '-6 days', 'weekday 1')", pd.Timedelta(weeks=1)),
+}
+
+# Aggregates of each source table, by output column
+AGGREGATES = {
+    "recent_usage": {
+        # An unknown ('-') capacity is cleaned to 0 and left out
+        "AVERAGE CAPACITY": 'AVG(NULLIF("CAPACITY REMAINING", 0))',
+        "MIN CAPACITY": 'MIN(NULLIF("CAPACITY REMAINING", 0))',
+        "MAX CAPACITY": 'MAX(NULLIF("CAPACITY REMAINING", 0))',
+        "ENTRIES": "COUNT(*)",
+        "BATTERY ENTRIES": "SUM(SOURCE = 'Battery')",
+    },
+    "battery_usage": {
+        "ENERGY DRAINED": 'SUM("ENERGY DRAINED")',
+        "DURATION": "SUM(DURATION)",
+        "DRAINS": "COUNT(*)",
+    },
+    # Periods are bucketed by their start date, so hours are too fine for them
+    "usage_history": {
+        "BATTERY DURATION ACTIVE": 'SUM("BATTERY DURATION ACTIVE")',
+        "BATTERY DURATION CONNECTED STANDBY": 'SUM("BATTERY DURATION CONNECTED STANDBY")',
+        "AC DURATION ACTIVE": 'SUM("AC DURATION ACTIVE")',
+        "AC DURATION CONNECTED STANDBY": 'SUM("AC DURATION CONNECTED STANDBY")',
+        "PERIODS": "COUNT(*)",
+    },
+}
+
+# Materialized rollup tables kept in the history store: name -> (source table, grain)
+ROLLUPS = {
+    f"{source}_{grain}": (source, grain)
+    for source in AGGREGATES
+    for grain in GRAINS
+    if not (source == "usage_history" and grain == "hourly")
+}
+
+def _ensure_tables(conn):
+    for name, (source, _) in ROLLUPS.items():
+        columns = ", ".join(f'"{column}" REAL' for column in AGGREGATES[source])
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (DEVICE TEXT, BUCKET TEXT, {columns}, PRIMARY KEY (DEVICE, BUCKET))")
+
+def _key_text(value, key):
+    return value.strftime("%Y-%m-%d" if key == "PERIOD_START" else "%Y-%m-%d %H:%M:%S")
+
+def refresh(conn, name, device, start=None, end=None):
+    """Recomputes the buckets of a rollup holding stored rows of device from start to end from the history store.
+
+    start and end are widened to whole buckets, without them every bucket of the device is recomputed.
+    """
+    source, grain = ROLLUPS[name]
+    key = history_store.HISTORY_KEYS[source]
+    bucket_of, length = GRAINS[grain]
+    bucket = bucket_of.format(key=key)
+
+    conditions, params = ["DEVICE = ?"], [device]
+    if start is not None:
+        first = pd.Timestamp(conn.execute(f"SELECT {bucket_of.format(key='?')}", [_key_text(start, key)]).fetchone()[0])
+        conditions.append(f"{key} >= ?")
+        params.append(_key_text(first, key))
+    if end is not None:
+        last = pd.Timestamp(conn.execute(f"SELECT {bucket_of.format(key='?')}", [_key_text(end, key)]).fetchone()[0])
+        conditions.append(f"{key} < ?")
+        params.append(_key_text(last + length, key))
+    where = " AND ".join(conditions)
+
+    columns = ", ".join(f'"{column}"' for column in AGGREGATES[source])
+    aggregates = ", ".join(AGGREGATES[source].values())
+    # Stored rows are only ever replaced, never removed, so every bucket of the range is rewritten
+    with conn:
+        conn.execute(f"INSERT OR REPLACE INTO {name} (DEVICE, BUCKET, {columns}) "
+                     f"SELECT DEVICE, {bucket}, {aggregates} FROM {source} WHERE {where} GROUP BY DEVICE, {bucket}",
+                     params)
+
+def update(conn, tables, device):
+    """Refreshes only the buckets covered by the report tables just merged into the history store.
+
+    The rows of a report replace the stored rows of their time range, so the
+    buckets of that range are recomputed from the store and all others are left
+    as they are. A device without rollups yet gets all of its buckets computed.
+    """
+    _ensure_tables(conn)
+    for name, (source, _) in ROLLUPS.items():
+        df = tables.get(source)
+        if df is None or df.empty:
+            continue
+        key = history_store.HISTORY_KEYS[source]
+        times = (start_times(df) if key == "START_TIME" else pd.to_datetime(df[key])).dropna()
+        if times.empty:
+            continue
+        if conn.execute(f"SELECT 1 FROM {name} WHERE DEVICE = ? LIMIT 1", [device]).fetchone() is None:
+            refresh(conn, name, device)
+        else:
+            refresh(conn, name, device, times.min(), times.max())
+
+def rebuild(conn):
+    """Recomputes every rollup of every device from the history store."""
+    _ensure_tables(conn)
+    for name, (source, _) in ROLLUPS.items():
+        with conn:
+            conn.execute(f"DELETE FROM {name}")
+        for (device,) in conn.execute(f"SELECT DISTINCT DEVICE FROM {source}").fetchall():
+            refresh(conn, name, device)
+
+def query_rollup(conn, name, start=None, end=None, device=None):
+    """Returns the buckets of a rollup starting within [start, end), optionally for one device."""
+    _ensure_tables(conn)
+    conditions, params = [], []
+    if device is not None:
+        conditions.append("DEVICE = ?")
+        params.append(device)
+    if start is not None:
+        conditions.append("BUCKET >= ?")
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%d %H:%M:%S"))
+    if end is not None:
+        conditions.append("BUCKET < ?")
+        params.append(pd.Timestamp(end).strftime("%Y-%m-%d %H:%M:%S"))
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    df = pd.read_sql_query(f"SELECT * FROM {name}{where} ORDER BY DEVICE, BUCKET", conn, params=params)
+    df["BUCKET"] = pd.to_datetime(df["BUCKET"], format="%Y-%m-%d %H:%M:%S")
+    return df
+
+def main():
+    from extract import HISTORY_PATH
+
+    parser = argparse.ArgumentParser(description="Show the hourly, daily and weekly rollups of the history store.")
+    parser.add_argument("rollup", nargs="?", choices=list(ROLLUPS), help="rollup to print (default: list them)")
+    parser.add_argument("--history", default=HISTORY_PATH, help="history store written by the extraction")
+    parser.add_argument("--start", default=None, help="first bucket to print, e.g. 2024-01-01")
+    parser.add_argument("--end", default=None, help="bucket to stop before")
+    parser.add_argument("--device", default=None, help="only this computer")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every rollup from the full history")
+    parser.add_argument("-o", "--output", default=None, help="CSV file to save the rollup to")
+    args = parser.parse_args()
+
+    conn = history_store.connect(args.history)
+    try:
+        if args.rebuild:
+            rebuild(conn)
+        if args.rollup is None:
+            _ensure_tables(conn)
+            for name in ROLLUPS:
+                print(f"{name}: {conn.execute(f'SELECT COUNT(*) FROM {name}').fetchone()[0]} buckets")
+            return
+        result = query_rollup(conn, args.rollup, args.start, args.end, args.device)
+    finally:
+        conn.close()
+
+    print(result.to_string(index=False))
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"Rollup saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import instrumentation
+from report_io import normalize_table, start_times
+
+# Columns that tag the rows of a fleet table, sessions never span two reports
+FLEET_COLUMNS = ["COMPUTER NAME", "REPORT"]
+
+SESSION_COLUMNS = [
+    "SESSION", "KIND", "STATE", "START_TIME", "END_TIME", "DURATION", "ENTRIES",
+    "START CAPACITY", "END CAPACITY", "ENERGY", "DRAIN RATE", "DEPTH OF DISCHARGE",
+]
+
+def _group_keys(df):
+    """Codes of the fleet columns present in df, so a change marks the start of another report."""
+    columns = [column for column in FLEET_COLUMNS if column in df.columns]
+    if not columns:
+        return columns, np.zeros(len(df), dtype=np.int64)
+    return columns, df.groupby(columns, sort=False, dropna=False).ngroup().to_numpy()
+
+def _percent(column):
+    """Parses 'N %' cells to floats. Only ~100 distinct values occur, so each is parsed once."""
+    codes, uniques = pd.factorize(column)
+    values = pd.to_numeric(pd.Series(uniques, dtype=str).str.rstrip(" %"), errors="coerce").astype(float).to_numpy()
+    # Missing cells have code -1, which picks the NaN appended at the end
+    return np.append(values, np.nan)[codes]
+
+def discharge_sessions(recent_usage):
+    """Splits recent usage into charge and discharge sessions, one row per session.
+
+    A session is a run of entries on the same power source and in the same
+    state: a discharge on battery, a charge on AC, split again where the
+    system goes between active, connected standby and suspended, so a drain
+    rate never mixes active and standby power. It ends where the next session
+    starts, or at its last entry when nothing follows in the same report.
+    ENERGY is the capacity lost over the session (negative while charging),
+    DRAIN RATE the average power in mW and DEPTH OF DISCHARGE the percentage
+    points below the start level the battery went down to. Everything is
+    computed with array operations: sessions start where the source or the
+    state differs from the previous entry.
+    """
+    group_columns, groups = _group_keys(recent_usage)
+    n = len(recent_usage)
+    if n == 0:
+        return pd.DataFrame(columns=[*group_columns, *SESSION_COLUMNS])
+
+    start = start_times(recent_usage).to_numpy()
+    on_battery = recent_usage["SOURCE"].eq("Battery").to_numpy()
+    states = pd.factorize(recent_usage["STATE"])[0]
+    # A '-' capacity is cleaned to 0 mWh, it means the value is unknown
+    capacity = recent_usage["CAPACITY REMAINING"].astype(float).to_numpy()
+    capacity = np.where(capacity > 0, capacity, np.nan)
+    percent = _percent(recent_usage["CAPACITY REMAINING PERCENT"])
+
+    # Run IDs: a new session starts whenever the source, the state or the report changes
+    change = np.ones(n, dtype=bool)
+    change[1:] = (on_battery[1:] != on_battery[:-1]) | (states[1:] != states[:-1]) | (groups[1:] != groups[:-1])
+    first = np.flatnonzero(change)
+    last = np.append(first[1:], n) - 1
+    followed = np.append(groups[last[:-1] + 1] == groups[last[:-1]], False)
+    end = np.where(followed, last + 1, last)
+
+    duration = (start[end] - start[first]) / np.timedelta64(1, "s")
+    energy = capacity[first] - capacity[end]
+    hours = np.where(duration > 0, duration / 3600, np.nan)
+    lowest = np.fmin(np.fmin.reduceat(percent, first), percent[end])
+    discharging = on_battery[first]
+
+    sessions = pd.DataFrame({
+        "SESSION": np.arange(len(first)),
+        "KIND": np.where(discharging, "Discharge", "Charge"),
+        "STATE": recent_usage["STATE"].to_numpy()[first],
+        "START_TIME": start[first],
+        "END_TIME": start[end],
+        "DURATION": pd.Series(duration).round().astype("Int64"),
+        "ENTRIES": last - first + 1,
+        "START CAPACITY": capacity[first],
+        "END CAPACITY": capacity[end],
+        "ENERGY": energy,
+        "DRAIN RATE": energy / hours,
+        "DEPTH OF DISCHARGE": np.where(discharging, percent[first] - lowest, np.nan),
+    })
+    for position, column in enumerate(group_columns):
+        sessions.insert(position, column, recent_usage[column].to_numpy()[first])
+    return sessions
+
+def daily_energy(battery_usage):
+    """Totals the battery drains of each day: energy in mWh, time on battery and average power in mW."""
+    group_columns = [column for column in FLEET_COLUMNS if column in battery_usage.columns]
+    days = battery_usage.assign(DATE=pd.to_datetime(battery_usage["DATE"]))
+    totals = days.groupby([*group_columns, "DATE"], sort=True, dropna=True).agg(
+        **{
+            "ENERGY DRAINED": ("ENERGY DRAINED", "sum"),
+            "DURATION": ("DURATION", "sum"),
+            "DRAINS": ("ENERGY DRAINED", "size"),
+        }
+    ).reset_index()
+    hours = totals["DURATION"].astype(float) / 3600
+    totals["AVERAGE DRAIN RATE"] = totals["ENERGY DRAINED"] / hours.where(hours > 0)
+    return totals
+
+# Derived tables written and cached next to the report tables
+DERIVED_TABLES = {
+    "discharge_sessions": ("recent_usage", discharge_sessions),
+    "daily_energy": ("battery_usage", daily_energy),
+}
+
+def derived_tables(report):
+    """Returns the derived tables of a ReportTables, computing them once and caching them on it."""
+    for name, (source, derive) in DERIVED_TABLES.items():
+        if name not in report.derived:
+            with instrumentation.stage("derive", table=name) as stage:
+                report.derived[name] = normalize_table(derive(getattr(report, source)), name)
+                stage.rows = len(report.derived[name])
+    return report.derived
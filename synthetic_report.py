@@ -0,0 +1,184 @@
+import argparse
+import random
+from datetime import datetime, timedelta
+
+# First recent usage entry and first history period of every synthetic report
+FIRST_ENTRY = datetime(2021, 1, 17, 10, 42, 12)
+FIRST_PERIOD = datetime(2020, 2, 24)
+
+# Daily single-date periods that close the history, as powercfg writes them
+TRAILING_DAYS = 5
+
+STATES = ["Active", "Connected standby", "Suspended"]
+XML_STATES = {"Active": "Active", "Connected standby": "ConnectedStandby", "Suspended": "Suspend"}
+
+HTML_HEADER = """<!DOCTYPE html>
+<html xmlns:ms="urn:schemas-microsoft-com:xslt" xmlns:bat="http://schemas.microsoft.com/battery/2012"><head><meta charset="utf-8"/><title>Battery report</title>
+<style>body{{font-family:Segoe UI}}</style><script>var x = 1 < 2;</script></head><body>
+<h1>Battery report</h1>
+<table style="margin-bottom: 6em;"><col/>
+<tr><td class="label">COMPUTER NAME</td><td>{computer}</td></tr>
+<tr><td class="label">SYSTEM PRODUCT NAME</td><td>LENOVO 20XX</td></tr>
+<tr><td class="label">BIOS</td><td>N2HET52W (1.35 ) 06/04/2020</td></tr>
+<tr><td class="label">OS BUILD</td><td>19041.1.amd64fre.vb_release.191206-1406</td></tr>
+<tr><td class="label">PLATFORM ROLE</td><td>Mobile</td></tr>
+<tr><td class="label">CONNECTED STANDBY</td><td>Supported</td></tr>
+<tr><td class="label">REPORT TIME</td><td class="dateTime"><span class="date">{report_date} </span><span class="time">{report_time}</span></td></tr>
+</table>
+<h2>Installed batteries</h2><div class="explanation">Information about each currently installed battery</div>
+<table><thead><tr><td> </td><td>BATTERY 1</td></tr></thead>
+<tr><td><span class="label">NAME</span></td><td>5B10W13930</td></tr>
+<tr><td><span class="label">MANUFACTURER</span></td><td>SMP</td></tr>
+<tr><td><span class="label">SERIAL NUMBER</span></td><td>1234</td></tr>
+<tr><td><span class="label">CHEMISTRY</span></td><td>LiP</td></tr>
+<tr><td><span class="label">DESIGN CAPACITY</span></td><td>51,000 mWh</td></tr>
+<tr style="height:0.4em;"></tr>
+<tr><td><span class="label">FULL CHARGE CAPACITY</span></td><td>{full_charge:,} mWh</td></tr>
+<tr><td><span class="label">CYCLE COUNT</span></td><td>-</td></tr>
+</table>
+"""
+
+def _periods(count):
+    """Weekly (start, end) periods followed by TRAILING_DAYS single days, end None."""
+    weeks = max(count - TRAILING_DAYS, 1)
+    periods = [(FIRST_PERIOD + timedelta(days=7 * week), FIRST_PERIOD + timedelta(days=7 * week + 7))
+               for week in range(weeks)]
+    last = FIRST_PERIOD + timedelta(days=7 * weeks)
+    return periods + [(last + timedelta(days=day), None) for day in range(TRAILING_DAYS)]
+
+def _entry_times(rng, rows, max_gap):
+    time = FIRST_ENTRY
+    for _ in range(rows):
+        time += timedelta(seconds=rng.randint(30, max_gap))
+        yield time
+
+def _html_start_time(time, last_date):
+    """START TIME cell: the date is only written on the first entry of each day."""
+    date = f"{time:%Y-%m-%d}"
+    if date != last_date:
+        return f'<span class="date">{date} </span><span class="time">{time:%H:%M:%S}</span>', date
+    return f'<span class="time">{time:%H:%M:%S}</span>', last_date
+
+def _hms(rng, max_hours=60):
+    return rng.choice(["-", f"{rng.randint(0, max_hours)}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"])
+
+def _html_period(start, end):
+    if end is None:
+        return f"{start:%Y-%m-%d}"
+    return f"{start:%Y-%m-%d}\n        - {end:%Y-%m-%d}"
+
+def html_report(rows, periods=None, seed=1, computer="DESKTOP-SYNTH"):
+    """Yields a battery-report.html in chunks, with rows recent usage entries.
+
+    It carries the quirks of real reports: dates written only on the first entry
+    of a day (and glued to the time once the cell text is joined), '-' for missing
+    values, single-date periods at the end of the history, separator columns in the
+    history tables and 'h:mm:ss N %' standby estimates, some of them over 100 hours.
+    """
+    rng = random.Random(seed)
+    periods = _periods(periods or max(rows // 100, TRAILING_DAYS + 1))
+    yield HTML_HEADER.format(computer=computer, report_date="2021-01-20", report_time="10:50:03",
+                             full_charge=45220)
+
+    yield ('<h2>Recent usage</h2><div class="explanation">Power states over the last 3 days</div>\n'
+           '<table><thead><tr><td class="centered">START TIME</td><td class="centered">STATE</td>'
+           '<td class="centered">SOURCE</td><td colspan="2" class="centered">CAPACITY REMAINING</td></tr></thead>\n')
+    last_date = None
+    for i, time in enumerate(_entry_times(rng, rows, 4000)):
+        start_time, last_date = _html_start_time(time, last_date)
+        capacity = f"{rng.randint(500, 51000):,} mWh" if rng.random() > 0.05 else "-"
+        yield (f'<tr class="{"even" if i % 2 == 0 else "odd"} dc {i + 1}"><td class="dateTime">{start_time}</td>'
+               f'<td class="state">{rng.choice(STATES)}</td><td class="acdc">{rng.choice(["Battery", "AC"])}</td>'
+               f'<td class="percent">{rng.randint(1, 100)} %</td><td class="mw">{capacity}</td></tr>\n')
+
+    yield ("</table>\n<h2>Battery usage</h2><div class='explanation'>Battery drains over the last 3 days</div>\n"
+           "<table><thead><tr><td>START TIME</td><td>STATE</td><td>DURATION</td><td colspan='2'>ENERGY DRAINED</td></tr></thead>\n")
+    last_date = None
+    for i, time in enumerate(_entry_times(rng, max(1, rows // 4), 8000)):
+        start_time, last_date = _html_start_time(time, last_date)
+        yield (f'<tr class="{"even" if i % 2 == 0 else "odd"} dc {i + 1}"><td class="dateTime">{start_time}</td>'
+               f'<td class="state">Active</td><td class="hms">{rng.randint(0, 5)}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}</td>'
+               f'<td class="percent">{rng.randint(1, 40)} %</td><td class="mw">{rng.randint(100, 20000):,} mWh</td></tr>\n')
+
+    yield ("</table>\n<h2>Usage history</h2><div class='explanation'>History of system usage on AC and battery</div>\n"
+           "<table><thead><tr><td> </td><td colspan='2' class='centered'>BATTERY DURATION</td><td class='colBreak'> </td>"
+           "<td colspan='2' class='centered'>AC DURATION</td></tr><tr><td>PERIOD</td><td>ACTIVE</td><td>CONNECTED STANDBY</td>"
+           "<td class='colBreak'> </td><td>ACTIVE</td><td>CONNECTED STANDBY</td></tr></thead>\n")
+    for i, (start, end) in enumerate(periods):
+        yield (f'<tr class="{"even" if i % 2 == 0 else "odd"} {i + 1}"><td class="dateTime">{_html_period(start, end)}</td>'
+               f'<td class="hms">{_hms(rng)}</td><td class="hms">{_hms(rng)}</td><td class="colBreak"> </td>'
+               f'<td class="hms">{_hms(rng)}</td><td class="hms">{_hms(rng)}</td></tr>\n')
+
+    yield ("</table>\n<h2>Battery capacity history</h2><div class='explanation'>Charge capacity history of the system's batteries</div>\n"
+           "<table><thead><tr><td>PERIOD</td><td>FULL CHARGE CAPACITY</td><td>DESIGN CAPACITY</td></tr></thead>\n")
+    for i, (start, end) in enumerate(periods):
+        yield (f'<tr class="{"even" if i % 2 == 0 else "odd"} {i + 1}"><td class="dateTime">{_html_period(start, end)}</td>'
+               f'<td class="mw">{rng.randint(40000, 51000):,} mWh</td><td class="mw">51,000 mWh</td></tr>\n')
+
+    yield ("</table>\n<h2>Battery life estimates</h2><div class='explanation'>Battery life estimates based on observed drains</div>\n"
+           "<table><thead><tr><td> </td><td colspan='2'>AT FULL CHARGE</td><td class='colBreak'> </td><td colspan='2'>AT DESIGN CAPACITY</td></tr>"
+           "<tr><td>PERIOD</td><td>ACTIVE</td><td>CONNECTED STANDBY</td><td class='colBreak'> </td><td>ACTIVE</td><td>CONNECTED STANDBY</td></tr></thead>\n")
+    for i, (start, end) in enumerate(periods):
+        standby = [rng.choice(["-", f"<span>{rng.randint(0, 500)}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}</span> "
+                                    f"<span>{rng.randint(1, 20)} %</span>"]) for _ in range(2)]
+        yield (f'<tr class="{"even" if i % 2 == 0 else "odd"} {i + 1}"><td class="dateTime">{_html_period(start, end)}</td>'
+               f'<td class="hms">{_hms(rng)}</td><td class="nullValue">{standby[0]}</td><td class="colBreak"> </td>'
+               f'<td class="hms">{_hms(rng)}</td><td class="nullValue">{standby[1]}</td></tr>\n')
+
+    yield ("</table>\n<div>Current estimate of battery life based on all observed drains since OS install</div>"
+           "<table><tr class='even 1'><td>Since OS install</td><td class='hms'>5:12:00</td><td>-</td><td class='colBreak'> </td>"
+           "<td class='hms'>6:00:00</td><td>-</td></tr></table>\n</body></html>\n")
+
+def xml_report(rows, periods=None, seed=1, computer="DESKTOP-SYNTH"):
+    """Yields a 'powercfg /batteryreport /xml' report in chunks, with rows usage entries."""
+    rng = random.Random(seed)
+    periods = _periods(periods or max(rows // 100, TRAILING_DAYS + 1))
+    yield ('<?xml version="1.0" encoding="utf-8"?>\n<BatteryReport xmlns="http://schemas.microsoft.com/battery/2012">\n'
+           '<ReportInformation><ReportVersion>1</ReportVersion><ScanTime>2021-01-20T09:50:03Z</ScanTime>'
+           '<LocalScanTime>2021-01-20T10:50:03</LocalScanTime></ReportInformation>\n'
+           f'<SystemInformation><ComputerName>{computer}</ComputerName><SystemManufacturer>LENOVO</SystemManufacturer>'
+           '<SystemProductName>20XX</SystemProductName><BIOSDate>06/04/2020</BIOSDate><BIOSVersion>N2HET52W (1.35 )</BIOSVersion>'
+           '<OSBuild>19041.1.amd64fre.vb_release.191206-1406</OSBuild><PlatformRole>Mobile</PlatformRole>'
+           '<ConnectedStandby>1</ConnectedStandby></SystemInformation>\n'
+           '<Batteries><Battery><Id>5B10W13930</Id><Manufacturer>SMP</Manufacturer><SerialNumber>1234</SerialNumber>'
+           '<Chemistry>LiP</Chemistry><DesignCapacity>51000</DesignCapacity><FullChargeCapacity>45220</FullChargeCapacity>'
+           '<CycleCount>0</CycleCount></Battery></Batteries>\n<RecentUsage>\n')
+
+    charge = 45000
+    for time in _entry_times(rng, rows, 4000):
+        on_ac = rng.random() < 0.5
+        charge = max(0, min(45220, charge + (rng.randint(0, 3000) if on_ac else -rng.randint(0, 3000))))
+        yield (f'<UsageEntry Timestamp="{time:%Y-%m-%dT%H:%M:%S}Z" LocalTimestamp="{time:%Y-%m-%dT%H:%M:%S}" '
+               f'Ac="{int(on_ac)}" EntryType="{XML_STATES[rng.choice(STATES)]}" ChargeCapacity="{charge}" Discharge="0" '
+               f'FullChargeCapacity="45220" IsNextOnBattery="0"/>\n')
+
+    yield "</RecentUsage>\n<History>\n"
+    for start, end in periods:
+        end = end or start + timedelta(days=1)
+        yield (f'<HistoryEntry StartDate="{start:%Y-%m-%d}T00:00:00Z" EndDate="{end:%Y-%m-%d}T00:00:00Z" '
+               f'LocalStartDate="{start:%Y-%m-%d}T00:00:00" LocalEndDate="{end:%Y-%m-%d}T00:00:00" DesignCapacity="51000" '
+               f'FullChargeCapacity="{rng.randint(40000, 51000)}" CycleCount="0" '
+               f'ActiveAcTime="PT{rng.randint(0, 40)}H{rng.randint(0, 59)}M{rng.randint(0, 59)}S" CsAcTime="PT{rng.randint(0, 40)}H3M1S" '
+               f'ActiveDcTime="PT{rng.randint(0, 10)}H{rng.randint(0, 59)}M1S" CsDcTime="P1DT2H" '
+               f'ActiveDcEnergy="{rng.randint(0, 90000)}" CsDcEnergy="{rng.randint(0, 5000)}"/>\n')
+    yield "</History>\n</BatteryReport>\n"
+
+def write_report(path, rows, periods=None, seed=1, computer="DESKTOP-SYNTH"):
+    """Writes a synthetic report, XML when path ends in .xml, else HTML, streaming it to disk."""
+    generate = xml_report if path.lower().endswith(".xml") else html_report
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(generate(rows, periods, seed, computer))
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic battery report for testing and benchmarks.")
+    parser.add_argument("output", help="report path, .xml for the XML format, anything else for HTML")
+    parser.add_argument("-n", "--rows", type=int, default=1000, help="recent usage entries (battery usage gets a quarter)")
+    parser.add_argument("-p", "--periods", type=int, default=None, help="history periods (default: rows / 100)")
+    parser.add_argument("-s", "--seed", type=int, default=1, help="random seed, the same seed gives the same report")
+    parser.add_argument("-c", "--computer", default="DESKTOP-SYNTH", help="computer name written in the report")
+    args = parser.parse_args()
+    print(f"Wrote {write_report(args.output, args.rows, args.periods, args.seed, args.computer)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+import pandas as pd
+
+import extract
+import synthetic_report
+
+def test_standby_estimates_of_100_hours_or_more():
+    time, percent = extract.extract_time_percentage(pd.Series(["425:15:02 4 %", "5:00:00 12 %", "-"]))
+    assert time.tolist() == ["425:15:02", "5:00:00", ""]
+    assert percent.tolist() == ["4", "12", ""]
+    assert extract.parse_durations(time).tolist() == [1530902, 18000, pd.NA]
+
+def test_synthetic_report_standby_estimates_reach_hundreds_of_hours(tmp_path):
+    path = synthetic_report.write_report(str(tmp_path / "battery-report.html"), 300)
+    estimates = extract.extract_report(path).battery_life_estimates
+    assert estimates["CONNECTED_STANDBY_TIME"].max() >= 100 * 3600
@@ -0,0 +1,64 @@
+import filecmp
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import extract
+import synthetic_report
+
+# 'N/A' is a real report value that a CSV read would take as missing
+BASE = "".join(synthetic_report.html_report(300)).replace("LENOVO 20XX", "N/A")
+
+def _recent_usage_changed(text):
+    """The report with the first recent usage capacity changed."""
+    section = text.index("Recent usage")
+    capacity = text.index(" mWh", section + 2000)
+    cell = text.rindex(">", 0, capacity) + 1
+    return text[:cell] + "1" + text[cell:]
+
+CHANGES = {
+    "warm": lambda text: text,
+    "only header": lambda text: text.replace("10:50:03", "11:50:03"),
+    "only recent_usage": _recent_usage_changed,
+}
+
+def _extract(tmp_path, monkeypatch, text, name, cache=True):
+    path = tmp_path / f"{name}.html"
+    path.write_text(text)
+    monkeypatch.setattr(extract, "generate_report", lambda report_dir, timeout, cancel: str(path))
+    monkeypatch.setattr(extract, "REPORT_CACHE", cache)
+    report_dir = str(tmp_path / name)
+    os.makedirs(report_dir, exist_ok=True)
+    history_path = str(tmp_path / f"{name}.sqlite")
+    return extract.run_extraction(report_dir, "csv", history_path=history_path), report_dir, history_path
+
+def _history(path):
+    conn = sqlite3.connect(path)
+    try:
+        names = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {name: pd.read_sql_query(f"SELECT * FROM {name}", conn) for name in names}
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("change", CHANGES)
+def test_cached_extraction_matches_full_extraction(tmp_path, monkeypatch, change):
+    _extract(tmp_path, monkeypatch, BASE, "cached")
+    text = CHANGES[change](BASE)
+    cached, cached_dir, cached_history = _extract(tmp_path, monkeypatch, text, "cached")
+    full, full_dir, full_history = _extract(tmp_path, monkeypatch, text, "full", cache=False)
+
+    for name in os.listdir(full_dir):
+        if name.endswith(".csv"):
+            assert filecmp.cmp(os.path.join(cached_dir, name), os.path.join(full_dir, name), shallow=False), name
+    assert cached.system_info == full.system_info
+    assert cached.battery_details == full.battery_details
+    for name in extract.TABLE_NAMES:
+        pd.testing.assert_frame_equal(getattr(cached, name), getattr(full, name))
+    for name, df in full.derived.items():
+        pd.testing.assert_frame_equal(cached.derived[name], df)
+
+    stored = _history(cached_history)
+    for name, df in _history(full_history).items():
+        pd.testing.assert_frame_equal(stored[name], df)
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+import extract
+import synthetic_report
+from extraction_job import ExtractionJob
+
+@pytest.fixture
+def job_options(tmp_path, monkeypatch):
+    """Points the extraction at a synthetic report instead of powercfg, writing below tmp_path."""
+    source = synthetic_report.write_report(str(tmp_path / "source.html"), 300)
+    monkeypatch.setattr(extract, "REPORT_SOURCE", source)
+    return {"report_dir": str(tmp_path / "battery-report"), "history_path": str(tmp_path / "history.sqlite")}
+
+def _events(job, limit=60):
+    """Polls the job like the GUI does until its worker has finished and every event is drained."""
+    events, deadline = [], time.monotonic() + limit
+    while job.thread.is_alive() or not job.events.empty():
+        assert time.monotonic() < deadline, "extraction did not finish"
+        events.extend(job.poll())
+        time.sleep(0.01)
+    return events + job.poll()
+
+def test_stages_then_done(job_options):
+    events = _events(ExtractionJob(**job_options).start())
+    stages = [value for kind, value in events if kind == "stage"]
+    assert stages == ["generating", "parsing", *(f"cleaning {name}" for name in extract.TABLE_NAMES),
+                      "analysing sessions", "writing", "saving history"]
+    kind, report = events[-1]
+    assert kind == "done"
+    assert report.system_info["Computer Name"] == "DESKTOP-SYNTH"
+    assert len(report.recent_usage) == 300
+
+def test_cancel(job_options):
+    job = ExtractionJob(**job_options)
+    job.cancel()
+    assert _events(job.start()) == [("cancelled", "Cancelled before generating")]
+
+def test_timeout(job_options, monkeypatch):
+    generate = extract.generate_report
+
+    # Holds the run in the generating stage until the job cancels it
+    def slow_generate(report_dir, timeout, cancel):
+        assert cancel.wait(10)
+        return generate(report_dir, timeout, cancel)
+
+    monkeypatch.setattr(extract, "generate_report", slow_generate)
+    job = ExtractionJob(timeout=0.05, **job_options).start()
+    events = _events(job)
+    assert job.timed_out
+    assert events == [("stage", "generating"), ("cancelled", "Timed out after 0.05s")]
@@ -0,0 +1,44 @@
+import sqlite3
+
+import pandas as pd
+
+import history_store
+from report_io import time_of_day
+
+def _recent_usage(times, states, sources):
+    return pd.DataFrame({
+        "DATE": pd.to_datetime(["2024-01-01"] * len(times)),
+        "TIME": time_of_day(pd.Series(times)),
+        "STATE": states,
+        "SOURCE": sources,
+        "CAPACITY REMAINING PERCENT": "50 %",
+        "CAPACITY REMAINING": [float(i) for i in range(len(times))],
+    })
+
+def test_entries_of_the_same_second_are_all_kept():
+    df = _recent_usage(["08:00:00", "08:00:00", "08:05:00"], ["Active", "Connected standby", "Active"], ["AC", "Battery", "Battery"])
+    conn = history_store.connect(":memory:")
+    assert history_store.upsert_tables(conn, {"recent_usage": df}, "LAPTOP") == {"recent_usage": 3}
+    # The same entries in a later report replace the stored ones instead of adding to them
+    history_store.upsert_tables(conn, {"recent_usage": df}, "LAPTOP")
+    stored = history_store.query_table(conn, "recent_usage")
+    assert stored["SEQUENCE"].tolist() == [0, 1, 0]
+    assert stored["SOURCE"].tolist() == ["AC", "Battery", "Battery"]
+    assert stored["STATE"].tolist() == ["Active", "Connected standby", "Active"]
+
+def test_stores_without_sequence_are_migrated(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    columns = [column for column in history_store._history_columns("recent_usage") if column != "SEQUENCE"]
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE recent_usage ({', '.join(map(history_store._quote, columns))}, PRIMARY KEY (DEVICE, START_TIME))")
+    conn.execute("INSERT INTO recent_usage VALUES ('LAPTOP', '2024-01-01 07:00:00', '2024-01-01', '07:00:00', "
+                 "'Active', 'AC', '50 %', 1.0)")
+    conn.commit()
+    conn.close()
+
+    conn = history_store.connect(path)
+    df = _recent_usage(["08:00:00", "08:00:00"], ["Active", "Active"], ["AC", "Battery"])
+    history_store.upsert_tables(conn, {"recent_usage": df}, "LAPTOP")
+    stored = history_store.query_table(conn, "recent_usage")
+    assert stored["START_TIME"].dt.strftime("%H:%M:%S").tolist() == ["07:00:00", "08:00:00", "08:00:00"]
+    assert stored["SEQUENCE"].tolist() == [0, 0, 1]
@@ -0,0 +1,17 @@
+import numpy as np
+
+from level_of_detail import level_of_detail
+
+def test_min_max_keeps_every_spike():
+    x = np.arange(200_000, dtype=float)
+    y = np.full(len(x), 400.0)
+    y[::1000] = 20000
+    _, drawn = level_of_detail(x, y, 1000, method="minmax")
+    assert len(drawn) <= 1000
+    assert (drawn == 20000).sum() == 200
+
+def test_lttb_stays_within_budget():
+    x = np.arange(50_000, dtype=float)
+    drawn_x, _ = level_of_detail(x, np.sin(x / 500), 500, start=10_000, end=20_000)
+    assert len(drawn_x) <= 500
+    assert drawn_x.min() >= 9_999 and drawn_x.max() <= 20_001
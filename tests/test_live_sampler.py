@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from live_sampler import BatterySource, RingBuffer, SysfsSource
+
+def _supply(root, name, **attributes):
+    supply = root / name
+    supply.mkdir()
+    for attribute, value in attributes.items():
+        (supply / attribute).write_text(f"{value}\n")
+
+def test_source_is_abstract():
+    with pytest.raises(TypeError):
+        BatterySource()
+
+def test_sysfs_energy_files(tmp_path):
+    _supply(tmp_path, "AC", type="Mains", online=1)
+    _supply(tmp_path, "BAT0", type="Battery", energy_now=30_000_000, energy_full=40_000_000)
+    source = SysfsSource(str(tmp_path))
+    try:
+        assert source.read() == (True, 30_000, 75)
+        # Files are re-read in place on every sample
+        (tmp_path / "AC" / "online").write_text("0\n")
+        (tmp_path / "BAT0" / "energy_now").write_text("20000000\n")
+        assert source.read() == (False, 20_000, 50)
+    finally:
+        source.close()
+
+def test_sysfs_charge_times_voltage(tmp_path):
+    # 2.5 Ah and 3 Ah at 12 V
+    _supply(tmp_path, "BAT1", type="Battery", charge_now=2_500_000, charge_full=3_000_000, voltage_now=12_000_000)
+    source = SysfsSource(str(tmp_path))
+    try:
+        on_ac, energy, percent = source.read()
+        assert not on_ac
+        assert energy == pytest.approx(30_000)
+        assert percent == pytest.approx(250 / 3)
+    finally:
+        source.close()
+
+def test_sysfs_without_battery(tmp_path):
+    _supply(tmp_path, "AC", type="Mains", online=1)
+    with pytest.raises(FileNotFoundError):
+        SysfsSource(str(tmp_path))
+
+def test_ring_buffer_wraps_in_time_order():
+    buffer = RingBuffer(capacity=4)
+    for i in range(6):
+        buffer.append(1000 + i, i % 2 == 0, 100.0 - i, 50.0)
+    times, on_ac, energy, _ = buffer.arrays()
+    assert times.tolist() == [1002, 1003, 1004, 1005]
+    assert on_ac.tolist() == [True, False, True, False]
+    assert energy.tolist() == [98.0, 97.0, 96.0, 95.0]
+
+def test_recent_usage_keeps_sub_second_times():
+    buffer = RingBuffer(capacity=4)
+    for i in range(4):
+        buffer.append(1_600_000_000 + i * 0.5, False, 100.0 - i, 50.0)
+    df = buffer.to_recent_usage()
+    assert (np.diff(df["TIME"].to_numpy()) == np.timedelta64(500_000, "us")).all()
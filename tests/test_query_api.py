@@ -0,0 +1,53 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import query_api
+from report_io import time_of_day, write_table
+
+@pytest.fixture
+def recent_usage():
+    return pd.DataFrame({
+        "DATE": pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-01", "2024-01-02"]),
+        "TIME": time_of_day(pd.Series(["08:10:00", "08:50:00", "14:00:00", "08:10:00"])),
+        "STATE": "Active",
+        "SOURCE": "Battery",
+        "CAPACITY REMAINING PERCENT": "50 %",
+        "CAPACITY REMAINING": [10.0, 20.0, 30.0, 40.0],
+    })
+
+def test_groups_by_hour_of_start_time(recent_usage):
+    result = query_api.query_table(recent_usage, group="hour", aggregate="sum")
+    assert result["HOUR"].dt.hour.tolist() == [8, 14, 8]
+    assert result["CAPACITY REMAINING"].tolist() == [30.0, 30.0, 40.0]
+
+def test_filters_within_a_day(recent_usage):
+    result = query_api.query_table(recent_usage, pd.Timestamp("2024-01-01 08:30"), pd.Timestamp("2024-01-01 15:00"))
+    assert result["CAPACITY REMAINING"].tolist() == [20.0, 30.0]
+
+def test_server_answers_bad_requests_with_json(tmp_path, recent_usage, monkeypatch):
+    write_table(recent_usage, "recent_usage", str(tmp_path))
+    server = query_api.make_server(str(tmp_path), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def get(path):
+        try:
+            with urllib.request.urlopen(base + path) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        assert get("/tables/recent_usage?start=2024-01-01T00:00Z")[0] == 200
+        assert get("/tables/recent_usage?start=yesterday")[0] == 400
+        monkeypatch.setattr(query_api, "query_table", lambda df, **options: 1 / 0)
+        status, body = get("/tables/recent_usage")
+        assert status == 500 and "ZeroDivisionError" in body["error"]
+    finally:
+        server.shutdown()
+        server.server_close()
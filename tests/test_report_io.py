@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+import extract
+import synthetic_report
+from report_io import TABLE_SCHEMAS, format_time_of_day, read_table, start_times, time_of_day, write_table
+
+pytest.importorskip("pyarrow")
+
+def test_arrow_and_csv_read_back_alike(tmp_path):
+    path = synthetic_report.write_report(str(tmp_path / "battery-report.html"), 300)
+    report = extract.extract_report(path)
+    extract.write_tables(report, str(tmp_path / "csv"), "csv")
+    extract.write_tables(report, str(tmp_path / "arrow"), "arrow")
+
+    for name in TABLE_SCHEMAS:
+        pd.testing.assert_frame_equal(read_table(name, str(tmp_path / "arrow")), read_table(name, str(tmp_path / "csv")))
+
+def test_arrow_keeps_nullable_integers(tmp_path):
+    df = pd.DataFrame({"DATE": pd.to_datetime(["2024-01-01", None]), "ENERGY DRAINED": [1.0, 2.0],
+                       "DURATION": pd.array([5, None], dtype="Int64"), "DRAINS": pd.array([1, 2], dtype="Int64")})
+    write_table(df, "daily_energy", str(tmp_path), "arrow")
+    result = read_table("daily_energy", str(tmp_path))
+    assert str(result["DURATION"].dtype) == "Int64"
+    assert str(result["DATE"].dtype) == "datetime64[us]"
+    assert result["DURATION"].isna().tolist() == [False, True]
+
+def test_start_times_combine_date_and_time():
+    df = pd.DataFrame({"DATE": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+                       "TIME": time_of_day(pd.Series(["23:59:59", "00:00:01", "12:00:00"]))})
+    expected = pd.to_datetime(["2024-01-01 23:59:59", "2024-01-02 00:00:01", None]).astype("datetime64[us]")
+    pd.testing.assert_series_equal(start_times(df), pd.Series(expected), check_names=False)
+    assert format_time_of_day(df["TIME"]).tolist() == ["23:59:59", "00:00:01", "12:00:00"]
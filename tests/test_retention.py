@@ -0,0 +1,41 @@
+import os
+
+import retention
+from retention import plan_eviction
+
+NOW = 1_000_000_000
+DAY = 86400
+
+def _paths(evicted):
+    return [path for path, _, _ in evicted]
+
+def test_entries_past_the_age_limit_go():
+    entries = [("old", 10, NOW - 40 * DAY), ("recent", 10, NOW - DAY)]
+    assert _paths(plan_eviction(entries, max_bytes=1000, max_age_days=30, now=NOW)) == ["old"]
+
+def test_least_recently_used_go_first_until_the_rest_fits():
+    # Sorted least recently used first, as list_entries returns them
+    entries = [("a", 40, NOW - 3 * DAY), ("b", 40, NOW - 2 * DAY), ("c", 40, NOW - DAY)]
+    assert _paths(plan_eviction(entries, max_bytes=50, max_age_days=30, now=NOW)) == ["a", "b"]
+    assert _paths(plan_eviction(entries, max_bytes=80, max_age_days=30, now=NOW)) == ["a"]
+    assert plan_eviction(entries, max_bytes=120, max_age_days=30, now=NOW) == []
+
+def test_entries_used_since_keep_since_are_kept():
+    entries = [("old", 40, NOW - 40 * DAY), ("this run", 100, NOW - 10)]
+    evicted = plan_eviction(entries, max_bytes=50, max_age_days=30, keep_since=NOW - 60, now=NOW)
+    assert _paths(evicted) == ["old"]
+
+def test_enforce_only_touches_the_managed_entries(tmp_path):
+    managed = tmp_path / "charts"
+    managed.mkdir()
+    (managed / "old.png").write_bytes(b"x" * 100)
+    os.utime(managed / "old.png", (NOW, NOW))
+    (managed / "new.png").write_bytes(b"x" * 100)
+    unmanaged = tmp_path / "thesis.docx"
+    unmanaged.write_bytes(b"x")
+    os.utime(unmanaged, (NOW, NOW))
+
+    evicted = retention.enforce({str(managed): True}, max_bytes=1000, max_age_days=30)
+    assert _paths(evicted) == [str(managed / "old.png")]
+    assert sorted(os.listdir(managed)) == ["new.png"]
+    assert unmanaged.exists()
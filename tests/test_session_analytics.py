@@ -0,0 +1,42 @@
+import pandas as pd
+
+from report_io import time_of_day
+from session_analytics import discharge_sessions
+
+def _recent_usage(rows, report=None):
+    """rows of (time, state, source, capacity) on 2024-01-01."""
+    times, states, sources, capacities = zip(*rows)
+    df = pd.DataFrame({
+        "DATE": pd.to_datetime(["2024-01-01"] * len(rows)),
+        "TIME": time_of_day(pd.Series(times)),
+        "STATE": states,
+        "SOURCE": sources,
+        "CAPACITY REMAINING PERCENT": [f"{capacity // 1000} %" for capacity in capacities],
+        "CAPACITY REMAINING": [float(capacity) for capacity in capacities],
+    })
+    if report is not None:
+        df.insert(0, "REPORT", report)
+    return df
+
+def test_sessions_split_on_source_and_state():
+    sessions = discharge_sessions(_recent_usage([
+        ("08:00:00", "Active", "Battery", 90000),
+        ("09:00:00", "Active", "Battery", 80000),
+        ("10:00:00", "Connected standby", "Battery", 70000),
+        ("12:00:00", "Active", "AC", 68000),
+        ("13:00:00", "Active", "AC", 90000),
+    ]))
+    assert sessions["KIND"].tolist() == ["Discharge", "Discharge", "Charge"]
+    assert sessions["STATE"].tolist() == ["Active", "Connected standby", "Active"]
+    assert sessions["ENTRIES"].tolist() == [2, 1, 2]
+    # Each session ends where the next one starts, the last at its own last entry
+    assert sessions["DURATION"].tolist() == [7200, 7200, 3600]
+    assert sessions["DRAIN RATE"].tolist() == [10000, 1000, -22000]
+
+def test_sessions_do_not_run_into_the_next_report():
+    first = _recent_usage([("08:00:00", "Active", "Battery", 90000), ("09:00:00", "Active", "Battery", 80000)], "a.html")
+    second = _recent_usage([("10:00:00", "Active", "Battery", 50000), ("11:00:00", "Active", "Battery", 40000)], "b.html")
+    sessions = discharge_sessions(pd.concat([first, second], ignore_index=True))
+    assert sessions["REPORT"].tolist() == ["a.html", "b.html"]
+    assert sessions["END_TIME"].dt.hour.tolist() == [9, 11]
+    assert sessions["ENERGY"].tolist() == [10000, 10000]
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+import extract
+import synthetic_report
+
+FIXTURE = """<?xml version="1.0" encoding="utf-8"?>
+<BatteryReport xmlns="http://schemas.microsoft.com/battery/2012">
+<ReportInformation><LocalScanTime>2021-01-20T10:50:03</LocalScanTime></ReportInformation>
+<SystemInformation><ComputerName>LAPTOP-1</ComputerName><SystemManufacturer>LENOVO</SystemManufacturer>
+<SystemProductName>20XX</SystemProductName><BIOSDate>06/04/2020</BIOSDate><BIOSVersion>N2HET52W</BIOSVersion>
+<OSBuild>19041</OSBuild></SystemInformation>
+<Batteries><Battery><Id>5B10W13930</Id><Manufacturer>SMP</Manufacturer><Chemistry>LiP</Chemistry>
+<DesignCapacity>51000</DesignCapacity><FullChargeCapacity>45000</FullChargeCapacity></Battery></Batteries>
+<RecentUsage>
+<UsageEntry LocalTimestamp="2021-01-17T08:00:00" Ac="0" EntryType="Active" ChargeCapacity="45000" FullChargeCapacity="45000"/>
+<UsageEntry LocalTimestamp="2021-01-17T09:00:00" Ac="1" EntryType="Active" ChargeCapacity="36000" FullChargeCapacity="45000"/>
+</RecentUsage>
+<History>
+<HistoryEntry LocalStartDate="2021-01-11T00:00:00" LocalEndDate="2021-01-18T00:00:00" DesignCapacity="51000"
+ FullChargeCapacity="45000" ActiveAcTime="PT1H" CsAcTime="PT2H" ActiveDcTime="PT3H" CsDcTime="P1DT2H"
+ ActiveDcEnergy="27000" CsDcEnergy="1000"/>
+</History>
+</BatteryReport>
+"""
+
+SYSTEM_INFO = {
+    "Computer Name": "LAPTOP-1",
+    "System Product Name": "LENOVO 20XX",
+    "OS Build": "19041",
+    "BIOS": "N2HET52W 06/04/2020",
+    "Report Time": "2021-01-20 10:50:03",
+}
+
+def _write(tmp_path, text):
+    path = tmp_path / "battery-report.xml"
+    path.write_text(text)
+    return str(path)
+
+def test_reads_fixture(tmp_path):
+    raw = extract.read_xml_report(_write(tmp_path, FIXTURE))
+    assert raw.system_info == SYSTEM_INFO
+    assert raw.battery_details == {"Battery Name": "5B10W13930", "Manufacturer": "SMP", "Chemistry": "LiP",
+                                   "Design Capacity": "51,000 mWh", "Full Charge Capacity": "45,000 mWh"}
+    assert raw.recent_usage.values.tolist() == [
+        ["2021-01-17 08:00:00", "Active", "Battery", "100 %", "45,000 mWh"],
+        ["2021-01-17 09:00:00", "Active", "AC", "80 %", "36,000 mWh"],
+    ]
+    # The battery entry drains until the next entry starts
+    assert raw.battery_usage.values.tolist() == [["2021-01-17 08:00:00", "Active", "1:00:00", "20 %", "9,000 mWh"]]
+    assert raw.usage_history.values.tolist() == [["2021-01-11 - 2021-01-18", "3:00:00", "26:00:00", "1:00:00", "2:00:00"]]
+    assert raw.battery_capacity_history.values.tolist() == [["2021-01-11 - 2021-01-18", "45,000 mWh", "51,000 mWh"]]
+    assert raw.battery_life_estimates["AT FULL CHARGE ACTIVE"].tolist() == ["5:00:00"]
+
+def test_tables_have_the_html_columns(tmp_path):
+    path = synthetic_report.write_report(str(tmp_path / "battery-report.xml"), 200)
+    raw = extract.read_xml_report(path)
+    for name, (_, _, columns) in extract.HTML_TABLES.items():
+        table = getattr(raw, name)
+        assert table.columns.tolist() == columns, name
+        assert len(table) > 0, name
+    assert len(raw.recent_usage) == 200
+    report = extract.clean_report(raw)
+    assert report.recent_usage["CAPACITY REMAINING"].notna().all()
+
+def test_missing_sections_are_not_available(tmp_path, monkeypatch):
+    text = FIXTURE[:FIXTURE.index("<SystemInformation>")] + FIXTURE[FIXTURE.index("<RecentUsage>"):]
+    path = _write(tmp_path, text)
+    raw = extract.read_xml_report(path)
+    assert raw.system_info == {**dict.fromkeys(SYSTEM_INFO, "N/A"), "Report Time": "2021-01-20 10:50:03"}
+    assert set(raw.battery_details.values()) == {"N/A"}
+
+    # The whole extraction, history included, runs on such a report
+    monkeypatch.setattr(extract, "generate_report", lambda report_dir, timeout, cancel: path)
+    report_dir = str(tmp_path / "battery-report")
+    os.makedirs(report_dir)
+    report = extract.run_extraction(report_dir, "csv", history_path=str(tmp_path / "history.sqlite"))
+    assert report.system_info["Computer Name"] == "N/A"
+    assert os.path.exists(os.path.join(report_dir, "system_info.csv"))
@@ -1,25 +1,42 @@
 import os
+import instrumentation
+from charts import PROFILE_NAME
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+from report_io import read_table
+from level_of_detail import LevelOfDetailLine
 
-# Get the directory path
-dir_path = os.path.dirname(os.path.abspath(__file__))
+def plot_usage_history(usage_history, ax):
+    """Draws battery and AC active time of each period on ax."""
+    # Comparison of Battery Duration Active and AC Duration Active, durations are stored in seconds
+    period_start = pd.to_datetime(usage_history['PERIOD_START'])
+    for column, label in [('BATTERY DURATION ACTIVE', 'Battery Duration Active'), ('AC DURATION ACTIVE', 'AC Duration Active')]:
+        LevelOfDetailLine(ax, period_start, usage_history[column].astype(float) / 3600, label=label)
+    ax.set_xlabel('Period')
+    ax.set_ylabel('Duration (hours)')
+    ax.set_title('Comparison of Battery Duration Active and AC Duration Active')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.legend(title='Duration Type')
 
-# Load dataset
-usage_history = pd.read_csv(os.path.join(dir_path, 'battery-report', 'usage_history.csv'))
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
 
-# Display the first few rows
-print("Usage History:")
-print(usage_history.head())
+    # Get the directory path
+    dir_path = os.path.dirname(os.path.abspath(__file__))
+    report_dir = os.path.join(dir_path, 'battery-report')
 
-# Visualization: Comparison of Battery Duration Active and AC Duration Active
-plt.figure(figsize=(50, 30))
-sns.lineplot(x='PERIOD', y='BATTERY DURATION ACTIVE', data=usage_history, label='Battery Duration Active')
-sns.lineplot(x='PERIOD', y='AC DURATION ACTIVE', data=usage_history, label='AC Duration Active')
-plt.xlabel('Period')
-plt.ylabel('Duration')
-plt.title('Comparison of Battery Duration Active and AC Duration Active')
-plt.xticks(rotation=45)
-plt.legend(title='Duration Type')
-plt.show()
\ No newline at end of file
+    # Load dataset
+    with instrumentation.stage('load', table='usage_history') as stage:
+        usage_history = read_table('usage_history', report_dir)
+        stage.rows = len(usage_history)
+
+    # Display the first few rows
+    print("Usage History:")
+    print(usage_history.head())
+
+    # Visualization
+    fig, ax = plt.subplots(figsize=(14, 7))
+    with instrumentation.stage('render', chart='usage_history'):
+        plot_usage_history(usage_history, ax)
+        fig.canvas.draw()
+    instrumentation.write(os.path.join(report_dir, PROFILE_NAME), append=True)
+    plt.show()
@@ -0,0 +1,155 @@
+import argparse
+import numpy as np
+import pandas as pd
+import history_store
+
+# Health (full charge / design capacity) the projection looks for by default
+DEFAULT_THRESHOLD = 80.0
+
+DAYS_PER_YEAR = 365.25
+
+EPOCH = pd.Timestamp("1970-01-01")
+
+# Per-device sufficient statistics of the least-squares fit of health over time.
+# T is in days since 1970-01-01, the sums are centered so they stay precise.
+STAT_COLUMNS = ["N", "MEAN_T", "MEAN_HEALTH", "M2_T", "C_T_HEALTH", "LAST_T", "LAST_HEALTH"]
+
+def period_points(battery_capacity_history, device=None):
+    """Turns capacity history rows into (DEVICE, T, HEALTH) points, dropping periods without both capacities."""
+    df = battery_capacity_history
+    design = df["DESIGN CAPACITY"].astype(float)
+    points = pd.DataFrame({
+        "DEVICE": df["DEVICE"] if device is None else device,
+        "T": (pd.to_datetime(df["PERIOD_START"]) - EPOCH) / pd.Timedelta(days=1),
+        "HEALTH": df["FULL CHARGE CAPACITY"].astype(float) / design.where(design > 0) * 100,
+    })
+    return points.dropna(subset=["T", "HEALTH"])
+
+def batch_stats(points):
+    """Computes the fit statistics of each device from a batch of points with group-wise array operations."""
+    points = points.sort_values(["DEVICE", "T"])
+    grouped = points.groupby("DEVICE", sort=False)
+    mean_t = grouped["T"].transform("mean")
+    mean_health = grouped["HEALTH"].transform("mean")
+    dt = points["T"] - mean_t
+    points = points.assign(DT2=dt * dt, DTDH=dt * (points["HEALTH"] - mean_health))
+    grouped = points.groupby("DEVICE", sort=False)
+    return pd.DataFrame({
+        "N": grouped.size(),
+        "MEAN_T": grouped["T"].mean(),
+        "MEAN_HEALTH": grouped["HEALTH"].mean(),
+        "M2_T": grouped["DT2"].sum(),
+        "C_T_HEALTH": grouped["DTDH"].sum(),
+        "LAST_T": grouped["T"].last(),
+        "LAST_HEALTH": grouped["HEALTH"].last(),
+    })
+
+def merge_stats(old, new):
+    """Combines two sets of per-device statistics (pairwise update of Chan et al.) without the points."""
+    devices = old.index.union(new.index)
+    a = old.reindex(devices)
+    b = new.reindex(devices)
+    na, nb = a["N"].fillna(0), b["N"].fillna(0)
+    a, b = a.fillna(0), b.fillna(0)
+    n = na + nb
+    d_t = b["MEAN_T"] - a["MEAN_T"]
+    d_health = b["MEAN_HEALTH"] - a["MEAN_HEALTH"]
+    weight = (na * nb / n).where(n > 0, 0)
+    newer = (nb > 0) & ((na == 0) | (b["LAST_T"] >= a["LAST_T"]))
+    return pd.DataFrame({
+        "N": n,
+        "MEAN_T": a["MEAN_T"] + d_t * (nb / n).where(n > 0, 0),
+        "MEAN_HEALTH": a["MEAN_HEALTH"] + d_health * (nb / n).where(n > 0, 0),
+        "M2_T": a["M2_T"] + b["M2_T"] + d_t * d_t * weight,
+        "C_T_HEALTH": a["C_T_HEALTH"] + b["C_T_HEALTH"] + d_t * d_health * weight,
+        "LAST_T": b["LAST_T"].where(newer, a["LAST_T"]),
+        "LAST_HEALTH": b["LAST_HEALTH"].where(newer, a["LAST_HEALTH"]),
+    })
+
+def estimates(stats, threshold=DEFAULT_THRESHOLD):
+    """Health, fade rate and projected date to reach threshold % health for each device.
+
+    FADE RATE is the fitted health lost per year. PROJECTED DATE is empty when
+    the fit does not decline or has fewer than two distinct dates.
+    """
+    slope = (stats["C_T_HEALTH"] / stats["M2_T"]).where(stats["M2_T"] > 0)
+    intercept = stats["MEAN_HEALTH"] - slope * stats["MEAN_T"]
+    fitted = intercept + slope * stats["LAST_T"]
+    days = ((threshold - intercept) / slope).where(slope < 0)
+    # Health already below the threshold is reported as reached on the last period
+    days = days.clip(lower=stats["LAST_T"].where(fitted <= threshold))
+    return pd.DataFrame({
+        "PERIODS": stats["N"].astype("Int64"),
+        "LAST PERIOD": EPOCH + pd.to_timedelta(stats["LAST_T"], unit="D"),
+        "HEALTH": stats["LAST_HEALTH"],
+        "FITTED HEALTH": fitted,
+        "FADE RATE": -slope * DAYS_PER_YEAR,
+        # Projections past the last representable date stay empty
+        "PROJECTED DATE": pd.to_datetime(days.round(), unit="D", errors="coerce"),
+    }, index=stats.index).rename_axis("DEVICE")
+
+def _ensure_table(conn):
+    columns = ", ".join(f"{column} REAL" for column in STAT_COLUMNS)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS wear_stats (DEVICE TEXT PRIMARY KEY, {columns})")
+
+def load_stats(conn):
+    _ensure_table(conn)
+    return pd.read_sql_query("SELECT * FROM wear_stats", conn, index_col="DEVICE")
+
+def save_stats(conn, stats):
+    _ensure_table(conn)
+    rows = stats[STAT_COLUMNS].astype(float).itertuples(name=None)
+    placeholders = ", ".join("?" for _ in range(len(STAT_COLUMNS) + 1))
+    with conn:
+        conn.executemany(f"INSERT OR REPLACE INTO wear_stats VALUES ({placeholders})", rows)
+
+def update(conn, battery_capacity_history, device=None):
+    """Folds the periods newer than each device's last fitted period into the stored statistics.
+
+    Only the new points are read, history already in the fit is never revisited.
+    Periods that a later report revises keep their first value in the fit.
+    """
+    points = period_points(battery_capacity_history, device)
+    stats = load_stats(conn)
+    last_t = points["DEVICE"].map(stats["LAST_T"]).fillna(-np.inf)
+    points = points[points["T"] > last_t]
+    if points.empty:
+        return stats.iloc[:0]
+    merged = merge_stats(stats, batch_stats(points)).loc[points["DEVICE"].unique()]
+    save_stats(conn, merged)
+    return merged
+
+def rebuild(conn):
+    """Recomputes the statistics of every device from the history store."""
+    history = history_store.query_table(conn, "battery_capacity_history")
+    stats = batch_stats(period_points(history))
+    _ensure_table(conn)
+    with conn:
+        conn.execute("DELETE FROM wear_stats")
+    save_stats(conn, stats)
+    return stats
+
+def main():
+    from extract import HISTORY_PATH
+
+    parser = argparse.ArgumentParser(description="Estimate battery wear of every device in the history store.")
+    parser.add_argument("--history", default=HISTORY_PATH, help="history store written by the extraction")
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD, help="health %% to project a date for")
+    parser.add_argument("--rebuild", action="store_true", help="refit every device from its full history")
+    parser.add_argument("-o", "--output", default=None, help="CSV file to save the estimates to")
+    args = parser.parse_args()
+
+    conn = history_store.connect(args.history)
+    try:
+        stats = rebuild(conn) if args.rebuild else load_stats(conn)
+    finally:
+        conn.close()
+
+    result = estimates(stats, args.threshold)
+    print(result.to_string())
+    if args.output:
+        result.to_csv(args.output)
+        print(f"Estimates saved to {args.output}")
+
+if __name__ == "__main__":
+    main()